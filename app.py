@@ -1,4 +1,8 @@
-from flask import Flask, jsonify, request
+import json
+import time
+STARTUP_BEGAN = time.perf_counter()
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from .services.top_traders_service import TopTradersService
 from .services.top_holders_service import TopHoldersService
@@ -14,6 +18,9 @@ from .services.eth_wallet_checker_service import EthWalletCheckerService
 from .services.gmgn_service import GMGNService
 from .services.transaction_scanner_service import TransactionScannerService
 from .services.wallet_details_service import WalletDetailsService
+from .services.http_client import get_http_client
+from .services.job_manager import JobManager
+from .services.lazy import LazyService
 
 app = Flask(__name__)
 
@@ -33,20 +40,69 @@ def log_request_info():
     app.logger.info('Headers: %s', request.headers)
     app.logger.info('Body: %s', request.get_data())
 
-top_traders_service = TopTradersService()
-top_holders_service = TopHoldersService()
-early_buyers_service = EarlyBuyersService()
-wallet_analyzer_service = WalletAnalyzerService()
-wallet_checker_service = WalletCheckerService()
-bsc_top_traders_service = BscTopTradersService()
-bsc_wallet_checker_service = BscWalletCheckerService()
-bundle_finder_service = BundleFinderService()
-eth_timestamp_service = EthTimestampService()
-eth_top_traders_service = EthTopTradersService()
-eth_wallet_checker_service = EthWalletCheckerService()
-gmgn_service = GMGNService()
-transaction_scanner_service = TransactionScannerService()
-wallet_details_service = WalletDetailsService()
+top_traders_service = LazyService(TopTradersService)
+top_holders_service = LazyService(TopHoldersService)
+early_buyers_service = LazyService(EarlyBuyersService)
+wallet_analyzer_service = LazyService(WalletAnalyzerService)
+wallet_checker_service = LazyService(WalletCheckerService)
+bsc_top_traders_service = LazyService(BscTopTradersService)
+bsc_wallet_checker_service = LazyService(BscWalletCheckerService)
+bundle_finder_service = LazyService(BundleFinderService)
+eth_timestamp_service = LazyService(EthTimestampService)
+eth_top_traders_service = LazyService(EthTopTradersService)
+eth_wallet_checker_service = LazyService(EthWalletCheckerService)
+gmgn_service = LazyService(GMGNService)
+transaction_scanner_service = LazyService(TransactionScannerService)
+wallet_details_service = LazyService(WalletDetailsService)
+job_manager = JobManager()
+
+# Services are built on first use, so a fresh worker only pays for what it serves
+LAZY_SERVICES = {
+    name: value for name, value in globals().items() if isinstance(value, LazyService)
+}
+
+# Long-running work that can be submitted as a background job:
+# type -> (required param, missing param message, runner)
+JOB_TYPES = {
+    'scan-transactions': (
+        'address', 'Contract address is required',
+        lambda params, progress: transaction_scanner_service.scan_transactions(
+            params['address'],
+            params.get('max_threads', 5),
+            params.get('resume', True),
+            progress=progress
+        )
+    ),
+    'analyze-wallets': (
+        'wallets', 'No wallet addresses provided',
+        lambda params, progress: wallet_analyzer_service.analyze_wallets(
+            params['wallets'],
+            params.get('filters', {}),
+            progress=progress
+        )
+    ),
+    'eth-check-wallets': (
+        'wallets', 'No wallet addresses provided',
+        lambda params, progress: eth_wallet_checker_service.check_eth_wallets(
+            params['wallets'],
+            params.get('max_threads', 5),
+            progress=progress
+        )
+    ),
+}
+
+def ndjson_response(batches, summary):
+    """Stream batches of records as newline-delimited JSON, then a summary record"""
+    def generate():
+        try:
+            for batch in batches:
+                if batch:
+                    yield ''.join(json.dumps(record) + '\n' for record in batch)
+            yield json.dumps({'summary': summary()}) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': str(e)}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
 
 @app.route("/api/")
 def home():
@@ -62,6 +118,40 @@ def home_s():
         "status": "success"
     })
 
+@app.route("/api/cache-stats")
+def get_cache_stats():
+    client = get_http_client()
+    return jsonify({
+        'success': True,
+        'data': {
+            **client.cache.stats(),
+            'coalesced': client.inflight.coalesced,
+            'circuits': client.breakers.stats(),
+            'hedging': client.hedges.stats(),
+            'fingerprints': client.health.stats(),
+            'clearance': client.clearance.stats()
+        }
+    })
+
+@app.route("/api/startup-stats")
+def get_startup_stats():
+    try:
+        # Unix only; there is no peak RSS to report on Windows
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        max_rss = None
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'startup_seconds': round(STARTUP_SECONDS, 4),
+            # Peak resident memory of this worker (kilobytes on Linux)
+            'max_rss': max_rss,
+            'services_loaded': sorted(name for name, service in LAZY_SERVICES.items() if service.loaded)
+        }
+    })
+
 @app.route("/api/top-traders", methods=['POST'])
 def get_top_traders():
     try:
@@ -251,7 +341,17 @@ def analyze_bundle():
                 'message': 'No contract address provided'
             }), 400
 
-        bundle_data = bundle_finder_service.analyze_bundle(contract_address)
+        # 'trades' detects bundles from trade history alone, 'transfers'
+        # resolves each team buy against solana.fm
+        mode = data.get('mode', 'transfers')
+        if mode == 'trades':
+            bundle_data = bundle_finder_service.analyze_bundle_from_trades(
+                contract_address,
+                data.get('window', 0),
+                data.get('max_pages', 5)
+            )
+        else:
+            bundle_data = bundle_finder_service.analyze_bundle(contract_address)
         
         if not bundle_data:
             return jsonify({
@@ -311,7 +411,6 @@ def get_eth_transactions_by_time():
         contract_address = data.get('address')
         start_time = data.get('start_time')
         end_time = data.get('end_time')
-        max_threads = data.get('max_threads', 5)
         
         if not all([contract_address, start_time, end_time]):
             return jsonify({
@@ -319,11 +418,33 @@ def get_eth_transactions_by_time():
                 'message': 'Contract address, start time, and end time are required'
             }), 400
 
+        if data.get('stream'):
+            totals = {'trades': 0, 'buyers': set()}
+
+            def batches():
+                for trades in eth_timestamp_service.iter_transactions_by_timestamp(
+                    contract_address,
+                    int(start_time),
+                    int(end_time),
+                    data.get('seek', True)
+                ):
+                    totals['trades'] += len(trades)
+                    totals['buyers'].update(trade['wallet'] for trade in trades if trade['type'] == 'buy')
+                    yield trades
+
+            return ndjson_response(batches(), lambda: {
+                'contract_address': contract_address,
+                'start_time': int(start_time),
+                'end_time': int(end_time),
+                'total_buyers': len(totals['buyers']),
+                'total_trades': totals['trades']
+            })
+
         results = eth_timestamp_service.get_transactions_by_timestamp(
             contract_address,
             int(start_time),
             int(end_time),
-            max_threads
+            data.get('seek', True)
         )
         
         return jsonify({
@@ -451,9 +572,20 @@ def scan_transactions():
                 'message': 'Contract address is required'
             }), 400
 
+        if data.get('stream'):
+            return ndjson_response(
+                transaction_scanner_service.iter_transactions(
+                    contract_address,
+                    max_threads,
+                    data.get('resume', True)
+                ),
+                lambda: transaction_scanner_service.scan_summary(contract_address)
+            )
+
         results = transaction_scanner_service.scan_transactions(
             contract_address,
-            max_threads
+            max_threads,
+            data.get('resume', True)
         )
         
         return jsonify({
@@ -467,6 +599,80 @@ def scan_transactions():
             'message': str(e)
         }), 500
 
+@app.route("/api/jobs", methods=['POST'])
+def submit_job():
+    try:
+        data = request.get_json()
+        job_type = data.get('type')
+        params = data.get('params') or {}
+
+        if job_type not in JOB_TYPES:
+            return jsonify({
+                'success': False,
+                'message': f"Invalid job type. Must be one of: {', '.join(JOB_TYPES)}"
+            }), 400
+
+        required, missing_message, runner = JOB_TYPES[job_type]
+        if not params.get(required):
+            return jsonify({
+                'success': False,
+                'message': missing_message
+            }), 400
+
+        job = job_manager.submit(job_type, runner, params)
+
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route("/api/jobs/<job_id>")
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': 'Job not found or expired'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    })
+
+@app.route("/api/jobs/<job_id>/result")
+def get_job_result(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': 'Job not found or expired'
+        }), 404
+
+    if job.status == 'failed':
+        return jsonify({
+            'success': False,
+            'message': job.error
+        }), 500
+
+    if not job.finished:
+        return jsonify({
+            'success': False,
+            'message': f"Job is {job.status}",
+            'data': job.to_dict()
+        }), 202
+
+    return jsonify({
+        'success': True,
+        'data': job.result
+    })
+
 @app.route("/api/wallet-details", methods=['POST'])
 def get_wallet_details():
     try:
@@ -507,5 +713,8 @@ def get_wallet_details():
             'message': str(e)
         }), 500
 
+STARTUP_SECONDS = time.perf_counter() - STARTUP_BEGAN
+app.logger.info("App ready in %.3fs", STARTUP_SECONDS)
+
 if __name__ == "__main__":
     app.run(debug=True)  
\ No newline at end of file
@@ -0,0 +1,96 @@
+import asyncio
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from .app import app as flask_app
+
+
+class ClientDisconnected(Exception):
+    """Raised into a response still being sent once its client has gone away"""
+
+
+def closing_app(environ, start_response):
+    """The Flask app, with its response closed however iteration ends
+
+    WsgiToAsgi drops the response iterable when a send fails without closing
+    it, so close() is called here; it ends a streamed generator (and the
+    upstream work behind it) and runs Flask's teardown.
+    """
+    iterable = flask_app(environ, start_response)
+    try:
+        yield from iterable
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+wsgi_app = WsgiToAsgi(closing_app)
+
+
+async def read_body(receive):
+    """Read the whole request body, or None if the client disconnects first"""
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def serve_http(scope, receive, send):
+    body = await read_body(receive)
+    if body is None:
+        return
+
+    disconnected = asyncio.Event()
+    delivered = False
+
+    async def replay():
+        # The adapter reads the buffered body; anything later is the disconnect
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def guarded_send(message):
+        if disconnected.is_set():
+            raise ClientDisconnected()
+        await send(message)
+
+    async def watch():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        # A context per request gives it its own thread instead of queueing
+        # every request on asgiref's single shared one
+        async with ThreadSensitiveContext():
+            await wsgi_app(scope, replay, guarded_send)
+    except ClientDisconnected:
+        pass
+    finally:
+        watcher.cancel()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point, e.g. `uvicorn ZyraAgent.asgi:app`"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    return await serve_http(scope, receive, send)
@@ -0,0 +1,37 @@
+import threading
+from .http_client import get_http_client
+
+class BaseService:
+    """Shared request plumbing for the gmgn.ai backed services"""
+    chain = 'sol'
+    accept = 'application/json, text/plain, */*'
+    priority = 'u=1, i'
+    extra_headers = {}
+
+    def __init__(self):
+        self.sendRequest = get_http_client()
+        # Worker threads each get their own headers so randomise() never
+        # swaps them out from under a request running on another thread
+        self._local = threading.local()
+
+    @property
+    def headers(self):
+        if getattr(self._local, 'headers', None) is None:
+            self.randomise()
+        return self._local.headers
+
+    def randomise(self):
+        """Reset the headers for the calling thread
+
+        The user agent and browser hints are not set here: the pooled session
+        that carries the request adds the ones matching its TLS fingerprint.
+        """
+        self._local.headers = {
+            'Host': 'gmgn.ai',
+            'accept': self.accept,
+            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
+            'dnt': '1',
+            'priority': self.priority,
+            'referer': f'https://gmgn.ai/?chain={self.chain}',
+            **self.extra_headers
+        }
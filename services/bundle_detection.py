@@ -0,0 +1,110 @@
+from bisect import bisect_right
+
+
+def cluster_wallets(bundles, total_supply: float):
+    """Merge bundles that share a wallet into clusters of linked wallets
+
+    A wallet buying in several bundles ties them together, so one operator
+    spreading buys over a few slots shows up as a single cluster.
+    """
+    parent = {}
+
+    def find(wallet):
+        while parent[wallet] != wallet:
+            parent[wallet] = parent[parent[wallet]]
+            wallet = parent[wallet]
+        return wallet
+
+    for bundle in bundles:
+        wallets = bundle['wallets']
+        for wallet in wallets:
+            parent.setdefault(wallet, wallet)
+        root = find(wallets[0])
+        for wallet in wallets[1:]:
+            parent[find(wallet)] = root
+
+    clusters = {}
+    for bundle in bundles:
+        cluster = clusters.setdefault(find(bundle['wallets'][0]), {
+            "wallets": set(), "bundles_count": 0, "total_amount": 0.0
+        })
+        cluster['wallets'].update(bundle['wallets'])
+        cluster['bundles_count'] += 1
+        cluster['total_amount'] += bundle['total_amount']
+
+    result = [
+        {
+            "wallets": sorted(cluster['wallets']),
+            "wallets_count": len(cluster['wallets']),
+            "bundles_count": cluster['bundles_count'],
+            "total_amount": cluster['total_amount'],
+            "supply_percentage": (cluster['total_amount'] / total_supply * 100) if total_supply else 0
+        }
+        for cluster in clusters.values()
+    ]
+    result.sort(key=lambda cluster: cluster['total_amount'], reverse=True)
+    return result
+
+
+def detect_bundles(trades, total_supply: float, window: int = 0, min_wallets: int = 2):
+    """Find bundled buys in trade history without per-transaction lookups
+
+    Buys are sorted by timestamp and swept once: a group holds every buy
+    landing within window seconds of the group's first buy, so the default of
+    0 groups buys of the same second (the same slot or two). A group is never
+    longer than window, so a steady stream of independent buys is not read as
+    one bundle. A group bought into by at least min_wallets distinct wallets
+    is reported as a bundle, and bundles sharing a wallet are merged into
+    wallet clusters. Supply percentages (0-100, under supply_percentage)
+    come from the traded base amounts.
+    """
+    buys = sorted(
+        (trade for trade in trades if trade.get('event') == "buy" and trade.get('timestamp') is not None),
+        key=lambda trade: trade['timestamp']
+    )
+    timestamps = [trade['timestamp'] for trade in buys]
+    groups = []
+    start = 0
+    while start < len(buys):
+        end = bisect_right(timestamps, timestamps[start] + window)
+        groups.append(buys[start:end])
+        start = end
+
+    bundles = []
+    bundled_wallets = set()
+    total_amount = 0.0
+    for group in groups:
+        wallets = {}
+        for trade in group:
+            wallets[trade['maker']] = wallets.get(trade['maker'], 0.0) + float(trade.get('base_amount') or 0)
+        if len(wallets) < min_wallets:
+            continue
+
+        amount = sum(wallets.values())
+        total_amount += amount
+        bundled_wallets.update(wallets)
+        bundles.append({
+            "timestamp": group[0]['timestamp'],
+            "wallets": sorted(wallets),
+            "wallets_count": len(wallets),
+            "transactions_count": len(group),
+            "tx_hashes": [trade['tx_hash'] for trade in group],
+            "creator_involved": any(
+                tag in trade.get('maker_token_tags', []) for trade in group for tag in ('creator', 'dev_team')
+            ),
+            "total_amount": amount,
+            "supply_percentage": (amount / total_supply * 100) if total_supply else 0
+        })
+
+    bundles.sort(key=lambda bundle: bundle['total_amount'], reverse=True)
+    return {
+        "bundle_detected": bool(bundles),
+        "bundles_count": len(bundles),
+        "bundled_wallets_count": len(bundled_wallets),
+        "transactions_count": sum(bundle['transactions_count'] for bundle in bundles),
+        "total_amount": total_amount,
+        "supply_percentage": (total_amount / total_supply * 100) if total_supply else 0,
+        "buys_scanned": len(buys),
+        "bundles": bundles,
+        "clusters": cluster_wallets(bundles, total_supply)
+    }
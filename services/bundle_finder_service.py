@@ -1,43 +1,23 @@
 import json
-import random
-import tls_client
-from fake_useragent import UserAgent
-import time
+from .base_service import BaseService
+from .concurrency import map_bounded, DEFAULT_MAX_WORKERS
+from .retry_policy import RetryPolicy
+from .trade_cursor import TradePaginator
+from .bundle_detection import detect_bundles
+from .response_cache import has_data
 
-class BundleFinderService:
+class BundleFinderService(BaseService):
     def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
+        super().__init__()
         self.formatTokens = lambda x: float(x) / 1_000_000  
         
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random
-        }
-
     def get_team_trades(self, contract_address: str):
         """Get team/creator trades for a token"""
         url = f"https://gmgn.ai/defi/quotation/v1/trades/sol/{contract_address}?limit=100&maker=&tag%5B%5D=creator&tag%5B%5D=dev_team"
-        retries = 3
+        retry = RetryPolicy(3)
         tx_hashes = set()
         
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
                 
@@ -50,7 +30,7 @@ class BundleFinderService:
                     total_supply = info['total_supply']
 
                     
-                    trades_response = self.sendRequest.get(url, headers=self.headers)
+                    trades_response = self.sendRequest.get(url, headers=self.headers, validate=has_data)
                     if trades_response.status_code == 200:
                         trades = trades_response.json()['data']['history']
                         
@@ -63,48 +43,64 @@ class BundleFinderService:
                             'tx_hashes': list(tx_hashes),
                             'total_supply': total_supply
                         }
+                retry.failed(info_response)
             except Exception as e:
                 print(f"Error fetching team trades on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
+        return None
+
+    def get_transfer_amounts(self, tx_hash: str):
+        """Get the token transfer amounts of a transaction, None if it could not be fetched"""
+        # Transfers of a confirmed transaction never change, so keep them for good
+        cache_key = f"solana:transfers:{tx_hash}"
+        amounts = self.sendRequest.cache.get(cache_key)
+        if amounts is not None:
+            return amounts
+
+        url = f"https://api.solana.fm/v0/transfers/{tx_hash}"
+        retry = RetryPolicy(3)
+
+        for attempt in retry:
+            try:
+                response = self.sendRequest.get(url)
+                if response.status_code == 200:
+                    transfer_data = response.json().get('result', {}).get('data', [])
+                    if not isinstance(transfer_data, list):
+                        return []
+
+                    amounts = [
+                        self.formatTokens(action.get('amount'))
+                        for action in transfer_data
+                        if action.get('action') == "transfer" and action.get("token") != ""
+                    ]
+                    # An empty result may just mean the transaction is not indexed yet
+                    if transfer_data:
+                        self.sendRequest.cache.set(cache_key, amounts, ttl=None, size=len(cache_key) + 8 * len(amounts))
+                    return amounts
+                retry.failed(response)
+            except Exception as e:
+                print(f"Error checking bundle on attempt {attempt + 1}: {e}")
+                retry.failed(error=e)
         return None
 
-    def check_bundle(self, tx_hashes: list, total_supply: int):
+    def check_bundle(self, tx_hashes: list, total_supply: int, max_threads=DEFAULT_MAX_WORKERS):
         """Check if transactions are bundled and get details"""
         total_amount = 0.00
         transactions = 0
         transaction_details = {}
 
-        for tx_hash in tx_hashes:
-            url = f"https://api.solana.fm/v0/transfers/{tx_hash}"
-            retries = 3
-            
-            for attempt in range(retries):
-                try:
-                    response = self.sendRequest.get(url)
-                    if response.status_code == 200:
-                        transfer_data = response.json().get('result', {}).get('data', [])
-                        
-                        if isinstance(transfer_data, list):
-                            amounts = []
-                            for action in transfer_data:
-                                if action.get('action') == "transfer" and action.get("token") != "":
-                                    amount = self.formatTokens(action.get('amount'))
-                                    amounts.append(amount)
-                                    total_amount += amount
-                                    transactions += 1
-                                    
-                            if amounts:
-                                amounts_percentages = [
-                                    (amount / total_supply * 100) for amount in amounts
-                                ]
-                                transaction_details[tx_hash] = {
-                                    "amounts": amounts,
-                                    "amounts_percentages": amounts_percentages
-                                }
-                        break
-                except Exception as e:
-                    print(f"Error checking bundle on attempt {attempt + 1}: {e}")
-                time.sleep(1)
+        results = map_bounded(self.get_transfer_amounts, tx_hashes, max_threads)
+        for tx_hash, amounts in zip(tx_hashes, results):
+            if not amounts:
+                continue
+            total_amount += sum(amounts)
+            transactions += len(amounts)
+            transaction_details[tx_hash] = {
+                "amounts": amounts,
+                "amounts_percentages": [
+                    (amount / total_supply * 100) for amount in amounts
+                ]
+            }
 
         return {
             "bundle_detected": transactions > 1,
@@ -139,4 +135,76 @@ class BundleFinderService:
             
         except Exception as e:
             print(f"Error analyzing bundle: {e}")
-            return None 
\ No newline at end of file
+            return None
+
+    def get_total_supply(self, contract_address: str):
+        """Get the total supply of a token"""
+        url = f"https://gmgn.ai/defi/quotation/v1/tokens/sol/{contract_address}"
+        retry = RetryPolicy(3)
+
+        for attempt in retry:
+            try:
+                self.randomise()
+                response = self.sendRequest.get(url, headers=self.headers)
+                if response.status_code == 200:
+                    info = response.json()
+                    token = info.get('data', {}).get('token', {})
+                    return float(token.get('total_supply') or info.get('total_supply') or 0)
+                retry.failed(response)
+            except Exception as e:
+                print(f"Error fetching total supply on attempt {attempt + 1}: {e}")
+                retry.failed(error=e)
+        return None
+
+    def fetch_trade_page(self, contract_address: str, cursor=None):
+        """Fetch one page of trades, oldest first, as (history, next_cursor)"""
+        url = f"https://gmgn.ai/vas/api/v1/token_trades/sol/{contract_address}?revert=true&limit=100"
+        if cursor:
+            url = f"{url}&cursor={cursor}"
+        retry = RetryPolicy(3)
+
+        for attempt in retry:
+            try:
+                self.randomise()
+                response = self.sendRequest.get(url, headers=self.headers)
+                if response.status_code == 200:
+                    data = response.json().get('data', {})
+                    return data.get('history', []), data.get('next')
+                retry.failed(response)
+            except Exception as e:
+                print(f"Error fetching trades page on attempt {attempt + 1}: {e}")
+                retry.failed(error=e)
+        return None
+
+    def analyze_bundle_from_trades(self, contract_address: str, window: int = 0, max_pages: int = 5):
+        """Detect bundles from the earliest trades alone, without solana.fm lookups
+
+        Bundles land at launch, so only the first max_pages pages of the
+        oldest-first trade history are read. Buys by several wallets within
+        window seconds of a group's first buy are grouped as one bundle.
+        Supply shares are reported as supply_percentage (0-100), unlike the
+        fractional percentage_of_supply of analyze_bundle.
+        """
+        try:
+            total_supply = self.get_total_supply(contract_address)
+            if not total_supply:
+                return None
+
+            trades = []
+            paginator = TradePaginator(
+                lambda cursor: self.fetch_trade_page(contract_address, cursor),
+                min(max(max_pages - 1, 1), 5)
+            )
+            for pages, history in enumerate(paginator.pages(), start=1):
+                trades.extend(history)
+                if pages >= max_pages:
+                    break
+
+            return {
+                "contract_address": contract_address,
+                **detect_bundles(trades, total_supply, window)
+            }
+
+        except Exception as e:
+            print(f"Error analyzing bundle from trades: {e}")
+            return None
@@ -0,0 +1,117 @@
+import time
+import threading
+from .endpoints import endpoint_family
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    # Retrying straight away would only hit the open circuit again
+    retryable = False
+
+    def __init__(self, family: str, retry_in: float):
+        super().__init__(f"Circuit open for {family}, next probe in {retry_in:.0f}s")
+        self.family = family
+        self.retry_in = retry_in
+
+
+def is_failure(status_code: int):
+    """Whether a response means the upstream is blocking us or unhealthy"""
+    return status_code in (403, 429) or status_code >= 500
+
+
+class CircuitBreaker:
+    """Stops calling an endpoint family after sustained failures
+
+    failure_threshold consecutive failures open the circuit. While open every
+    call fails fast; after reset_timeout a single probe is let through
+    (half-open) and its outcome either closes the circuit or re-opens it.
+    """
+
+    def __init__(self, family: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.family = family
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go upstream now"""
+        if not self.allow():
+            raise CircuitOpenError(self.family, self.retry_in())
+
+    def retry_in(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record(self, success: bool):
+        """Record the outcome of a call that allow() let through"""
+        with self._lock:
+            self._probing = False
+            if success:
+                self.state = CLOSED
+                self.failures = 0
+                self.opened_at = None
+                return
+
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"Circuit opened for {self.family} after {self.failures} failures")
+                    self.trips += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "trips": self.trips
+            }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per endpoint family, created on first use"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str):
+        family = endpoint_family(url)
+        with self._lock:
+            breaker = self._breakers.get(family)
+            if breaker is None:
+                breaker = CircuitBreaker(family, self.failure_threshold, self.reset_timeout)
+                self._breakers[family] = breaker
+            return breaker
+
+    def stats(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.family: breaker.stats() for breaker in breakers}
@@ -0,0 +1,90 @@
+import time
+import threading
+
+# Cookies Cloudflare hands out once a client has passed its checks
+CLEARANCE_COOKIES = ('cf_clearance', '__cf_bm')
+
+# Lifetime assumed for clearance cookies that arrive without an expiry
+DEFAULT_CLEARANCE_TTL = 1800
+
+
+class Clearance:
+    """A clearance cookie as handed out by Cloudflare"""
+
+    def __init__(self, name: str, value: str, domain: str, path: str, expires_at: float):
+        self.name = name
+        self.value = value
+        self.domain = domain
+        self.path = path
+        self.expires_at = expires_at
+
+    @property
+    def expired(self):
+        return self.expires_at <= time.time()
+
+
+class ClearanceStore:
+    """Process-wide Cloudflare clearance cookies, per upstream host and user agent
+
+    Cookies earned by any session (a pooled tls_client session or the
+    cloudscraper fallback) are harvested here and seeded into every other
+    session that presents the same user agent, until they expire. Cloudflare
+    binds cf_clearance to the user agent that solved the challenge, so a
+    clearance is never handed to a session speaking with another one.
+    """
+
+    def __init__(self):
+        self._cookies = {}
+        self._lock = threading.Lock()
+
+    def harvest(self, host: str, user_agent: str, jar):
+        """Pick clearance cookies out of a session's cookie jar"""
+        now = time.time()
+        found = [cookie for cookie in jar if cookie.name in CLEARANCE_COOKIES and cookie.value]
+        if not found:
+            return
+        with self._lock:
+            cookies = self._cookies.setdefault((host, user_agent), {})
+            for cookie in found:
+                current = cookies.get(cookie.name)
+                if current is not None and current.value == cookie.value:
+                    continue
+                expires_at = cookie.expires if cookie.expires else now + DEFAULT_CLEARANCE_TTL
+                if expires_at <= now:
+                    continue
+                cookies[cookie.name] = Clearance(
+                    cookie.name, cookie.value, cookie.domain, cookie.path or '/', expires_at
+                )
+
+    def get(self, host: str, user_agent: str):
+        """Unexpired clearance cookies for a host and user agent"""
+        with self._lock:
+            cookies = self._cookies.get((host, user_agent))
+            if not cookies:
+                return []
+            for name in [name for name, clearance in cookies.items() if clearance.expired]:
+                del cookies[name]
+            return list(cookies.values())
+
+    def seed(self, host: str, user_agent: str, jar):
+        """Copy the matching clearance cookies into a session's cookie jar"""
+        for clearance in self.get(host, user_agent):
+            jar.set(clearance.name, clearance.value, domain=clearance.domain, path=clearance.path)
+
+    def invalidate(self, host: str, user_agent: str):
+        """Forget a clearance, e.g. once it has been challenged anyway"""
+        with self._lock:
+            self._cookies.pop((host, user_agent), None)
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            stats = {}
+            for (host, user_agent), cookies in self._cookies.items():
+                live = {
+                    name: round(clearance.expires_at - now)
+                    for name, clearance in cookies.items() if clearance.expires_at > now
+                }
+                if live:
+                    stats.setdefault(host, []).append({"user_agent": user_agent, "expires_in": live})
+            return stats
@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEFAULT_MAX_WORKERS = 10
+
+# Seconds a single item (e.g. one wallet) may spend on its sub-requests
+DEFAULT_DEADLINE = 30
+
+
+def map_bounded(fn, items, max_workers: int = DEFAULT_MAX_WORKERS, progress=None):
+    """Run fn over items with at most max_workers in flight
+
+    Results come back in the same order as items. A call that raises is
+    logged and yields None so one bad address never sinks the whole batch.
+    Upstream pressure is additionally capped per host by the shared HttpClient.
+    progress, when given, is called as progress(done, total) after each item.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    done = [0]
+    done_lock = threading.Lock()
+
+    def run(item):
+        try:
+            return fn(item)
+        except Exception as e:
+            print(f"Error processing {item}: {e}")
+            return None
+        finally:
+            if progress:
+                with done_lock:
+                    done[0] += 1
+                    progress(done[0], len(items))
+
+    workers = max(1, min(int(max_workers), len(items)))
+    if workers == 1:
+        return [run(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, items))
+
+
+def gather(calls, deadline: float = DEFAULT_DEADLINE, required=()):
+    """Run independent calls concurrently and collect what finishes by the deadline
+
+    calls maps a name to a zero-argument callable. Every call gets its own
+    thread straight away, so the deadline only ever measures the call itself
+    and never time spent queued behind other wallets. The result maps every
+    name to its return value, or to None when the call raised or was still
+    running at the deadline; a late call is left to finish in the background.
+    Calls named in required are always waited for, however long they take.
+    """
+    if not calls:
+        return {}
+
+    executor = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix='gather')
+    try:
+        futures = {name: executor.submit(fn) for name, fn in calls.items()}
+        wait([future for name, future in futures.items() if name not in required], timeout=deadline)
+        wait([future for name, future in futures.items() if name in required])
+    finally:
+        executor.shutdown(wait=False)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            print(f"{name} missed the {deadline}s deadline")
+            results[name] = None
+        elif future.exception() is not None:
+            print(f"Error fetching {name}: {future.exception()}")
+            results[name] = None
+        else:
+            results[name] = future.result()
+    return results
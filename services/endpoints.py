@@ -0,0 +1,27 @@
+import re
+from urllib.parse import urlsplit
+
+# (pattern on host + path, family). Families group the endpoints of a host that
+# share upstream limits and failure modes; the first match wins.
+ENDPOINT_FAMILIES = [
+    (r'gmgn\.ai/(defi/quotation/v1/trades|vas/api/v1/token_trades)/', 'trades'),
+    (r'gmgn\.ai/defi/quotation/v1/tokens/top_traders/', 'top_traders'),
+    (r'gmgn\.ai/defi/quotation/v1/tokens/top_holders/', 'top_holders'),
+    (r'gmgn\.ai/defi/quotation/v1/tokens/', 'token'),
+    (r'gmgn\.ai/(defi/quotation/v1/smartmoney|defi/quotation/v1/rank/\w+/wallets|api/v1/wallet_)', 'wallet'),
+    (r'gmgn\.ai/defi/quotation/v1/(rank|pairs)/', 'rank'),
+    (r'api\.solana\.fm/v0/transfers/', 'transfers'),
+]
+
+_FAMILIES = [(re.compile(pattern), family) for pattern, family in ENDPOINT_FAMILIES]
+
+
+def endpoint_family(url: str):
+    """Name the endpoint family of a url as 'host/family', or just the host"""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    target = f"{host}{parts.path}"
+    for pattern, family in _FAMILIES:
+        if pattern.search(target):
+            return f"{host}/{family}"
+    return host
@@ -1,122 +1,183 @@
-import random
-import tls_client
-from fake_useragent import UserAgent
-import concurrent.futures
-import time
-
-class EthTimestampService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=eth',  
-            'user-agent': self.ua.random
-        }
+from .base_service import BaseService
+from .trade_cursor import TradeCursor
+from .retry_policy import RetryPolicy
+from .response_cache import has_data
+
+class EthTimestampService(BaseService):
+    chain = 'eth'
 
     def get_mint_timestamp(self, contract_address: str):
         """Get contract creation timestamp"""
         url = f"https://gmgn.ai/defi/quotation/v1/tokens/eth/{contract_address}"
-        retries = 3
+        retry = RetryPolicy(3)
 
-        for attempt in range(retries):
+        # A contract's creation timestamp never changes, so keep it for good
+        cache_key = f"eth:creation_timestamp:{contract_address.lower()}"
+        timestamp = self.sendRequest.cache.get(cache_key)
+        if timestamp is not None:
+            return timestamp
+
+        for attempt in retry:
             try:
                 self.randomise()
-                response = self.sendRequest.get(url, headers=self.headers)
+                response = self.sendRequest.get(url, headers=self.headers, validate=has_data)
                 if response.status_code == 200:
                     data = response.json()
-                    return data['data']['token']['creation_timestamp']
+                    timestamp = data['data']['token']['creation_timestamp']
+                    self.sendRequest.cache.set(cache_key, timestamp, ttl=None, size=len(cache_key) + 8)
+                    return timestamp
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching mint timestamp on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
     def fetch_trades_page(self, url):
         """Fetch a single page of trades"""
-        retries = 3
-        for attempt in range(retries):
+        retry = RetryPolicy(3)
+        for attempt in retry:
             try:
                 self.randomise()
                 response = self.sendRequest.get(url, headers=self.headers)
                 if response.status_code == 200:
                     return response.json()
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching trades page on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
-    def get_transactions_by_timestamp(self, contract_address: str, start_time: int, end_time: int, max_threads: int = 5):
-        """Get all transactions within a time range"""
-        base_url = f"https://gmgn.ai/defi/quotation/v1/trades/eth/{contract_address}?limit=100"
-        urls = []
-        all_trades = []
-        paginator = None
-        
-        print(f"Collecting trade pages for {contract_address}...")
+    def get_page_trades(self, url):
+        """Fetch a page and split it into its trades and the next cursor"""
+        page_data = self.fetch_trades_page(url)
+        if not page_data:
+            return None
+        data = page_data.get('data') or {}
+        return data.get('history') or [], data.get('next')
+
+    def seek_to_timestamp(self, base_url: str, end_time: int, first_page, max_probes: int = 32):
+        """Locate the newest page holding trades at or before end_time
 
-        
+        Timestamp cursors jump straight to end_time. Offset cursors gallop over
+        synthesized page offsets and then binary search the boundary, so only a
+        handful of the pages newer than end_time are ever requested. Returns
+        (trades, next_cursor), or None when the cursor cannot be predicted and
+        the caller should walk serially instead.
+        """
+        cursor = TradeCursor.decode(first_page[1])
+        if cursor is None:
+            return None
+
+        if cursor.is_timestamp:
+            page = self.get_page_trades(f"{base_url}&cursor={cursor.at_timestamp(end_time + 1)}")
+            if page is None or any(trade['timestamp'] > end_time for trade in page[0]):
+                return None
+            return page
+
+        # Offset cursor: the first "next" cursor is the offset of page 1
+        step = cursor.value
+        if step <= 0:
+            return None
+
+        pages = {0: first_page}
+
+        def probe(index):
+            if index not in pages:
+                url = f"{base_url}&cursor={cursor.with_value(index * step)}"
+                pages[index] = self.get_page_trades(url)
+            return pages[index]
+
+        def before_boundary(page):
+            trades = page[0]
+            return bool(trades) and trades[-1]['timestamp'] > end_time
+
+        lo, hi = 0, 1
         while True:
-            url = f"{base_url}&cursor={paginator}" if paginator else base_url
-            page_data = self.fetch_trades_page(url)
-            
-            if not page_data:
+            page = probe(hi)
+            if page is None or len(pages) > max_probes:
+                return None
+            if not before_boundary(page):
                 break
-                
-            trades = page_data.get('data', {}).get('history', [])
-            if not trades or trades[-1]['timestamp'] < start_time:
-                break
-                
-            urls.append(url)
-            paginator = page_data['data'].get('next')
+            lo, hi = hi, hi * 2
+
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            page = probe(mid)
+            if page is None or len(pages) > max_probes:
+                return None
+            if before_boundary(page):
+                lo = mid
+            else:
+                hi = mid
+
+        trades, next_cursor = pages[hi]
+        # Synthesized offsets must line up with the real ordering of the feed
+        if trades and pages[lo][0][-1]['timestamp'] < trades[0]['timestamp']:
+            return None
+        return trades, next_cursor
+
+    def iter_trade_pages(self, base_url: str, end_time: int = None):
+        """Yield each page of trades once, newest first
+
+        When end_time is given, pages entirely newer than it are skipped where
+        the cursor format allows seeking.
+        """
+        page = self.get_page_trades(base_url)
+        if page is None:
+            return
+
+        trades, paginator = page
+        if end_time is not None and paginator and trades and trades[-1]['timestamp'] > end_time:
+            boundary = self.seek_to_timestamp(base_url, end_time, page)
+            if boundary is not None:
+                trades, paginator = boundary
+
+        while trades:
+            yield trades
             if not paginator:
                 break
+            page = self.get_page_trades(f"{base_url}&cursor={paginator}")
+            if page is None:
+                break
+            trades, paginator = page
+
+    def iter_transactions_by_timestamp(self, contract_address: str, start_time: int, end_time: int,
+                                       seek: bool = True):
+        """Yield the trades within a time range in batches, one per page
+
+        Pages are walked newest first and the walk stops at the first page that
+        reaches past start_time. With seek the walk starts at the end_time
+        boundary instead of the newest page.
+        """
+        base_url = f"https://gmgn.ai/defi/quotation/v1/trades/eth/{contract_address}?limit=100"
+        pages = 0
+
+        print(f"Collecting trade pages for {contract_address}...")
+
+        for trades in self.iter_trade_pages(base_url, end_time if seek else None):
+            pages += 1
+            yield [
+                {
+                    "wallet": trade.get("maker"),
+                    "timestamp": trade.get("timestamp"),
+                    "type": trade.get("event"),
+                    "amount_usd": trade.get("amount_usd"),
+                    "tx_hash": trade.get("tx_hash")
+                }
+                for trade in trades
+                if start_time <= trade['timestamp'] <= end_time
+            ]
+            if trades[-1]['timestamp'] < start_time:
+                break
+
+        print(f"Processed {pages} pages for transactions")
 
-        
-        print(f"Processing {len(urls)} pages for transactions...")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = []
-            for url in urls:
-                futures.append(executor.submit(self.fetch_trades_page, url))
-
-            for future in concurrent.futures.as_completed(futures):
-                page_data = future.result()
-                if not page_data:
-                    continue
-                    
-                trades = page_data.get('data', {}).get('history', [])
-                filtered_trades = [
-                    trade for trade in trades 
-                    if start_time <= trade['timestamp'] <= end_time
-                ]
-                all_trades.extend(filtered_trades)
-
-        
+    def get_transactions_by_timestamp(self, contract_address: str, start_time: int, end_time: int,
+                                      seek: bool = True):
+        """Get all transactions within a time range"""
         processed_trades = []
-        for trade in all_trades:
-            processed_trade = {
-                "wallet": trade.get("maker"),
-                "timestamp": trade.get("timestamp"),
-                "type": trade.get("event"),
-                "amount_usd": trade.get("amount_usd"),
-                "tx_hash": trade.get("tx_hash")
-            }
-            processed_trades.append(processed_trade)
+        for trades in self.iter_transactions_by_timestamp(contract_address, start_time, end_time, seek):
+            processed_trades.extend(trades)
 
         return {
             "contract_address": contract_address,
@@ -124,4 +185,4 @@ class EthTimestampService:
             "end_time": end_time,
             "total_trades": len(processed_trades),
             "trades": processed_trades
-        } 
\ No newline at end of file
+        }
@@ -1,116 +1,72 @@
-import time
-import random
-import tls_client
-import cloudscraper
-from fake_useragent import UserAgent
+from .base_service import BaseService
+from .concurrency import gather, DEFAULT_DEADLINE
+from .retry_policy import RetryPolicy
+from .pnl_distribution import pnl_distribution
+from .response_cache import has_data
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-class EthWalletCheckerService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.cloudScraper = cloudscraper.create_scraper()
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-        self.sendRequest.timeout_seconds = 60
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=eth',  
-            'user-agent': self.ua.random
-        }
+class EthWalletCheckerService(BaseService):
+    chain = 'eth'
 
     def get_token_distribution(self, wallet: str, period='30d'):
         """Get token distribution data for an ETH wallet"""
         url = f"https://gmgn.ai/defi/quotation/v1/rank/eth/wallets/{wallet}/unique_token_7d?interval={period}"
-        retries = 3
+        retry = RetryPolicy(3)
         
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
-                response = self.sendRequest.get(url, headers=self.headers)
+                response = self.sendRequest.get(url, headers=self.headers, validate=has_data)
                 if response.status_code == 200:
                     data = response.json()
-                    tokens = data['data']['tokens']
-                    
-                    distribution = {
-                        "-50% +": 0,
-                        "0% - -50%": 0,
-                        "0 - 50%": 0,
-                        "50% - 199%": 0,
-                        "200% - 499%": 0,
-                        "500% - 600%": 0,
-                        "600% +": 0
-                    }
-
-                    for token in tokens:
-                        profit_pnl = token.get('total_profit_pnl')
-                        if profit_pnl is not None:
-                            profit_percentage = profit_pnl * 100
-                            
-                            if profit_percentage <= -50:
-                                distribution["-50% +"] += 1
-                            elif -50 < profit_percentage < 0:
-                                distribution["0% - -50%"] += 1
-                            elif 0 <= profit_percentage < 50:
-                                distribution["0 - 50%"] += 1
-                            elif 50 <= profit_percentage < 199:
-                                distribution["50% - 199%"] += 1
-                            elif 200 <= profit_percentage < 499:
-                                distribution["200% - 499%"] += 1
-                            elif 500 <= profit_percentage < 600:
-                                distribution["500% - 600%"] += 1
-                            else:
-                                distribution["600% +"] += 1
-                                
-                    return distribution
+                    return pnl_distribution.distribute(data['data']['tokens'])
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching token distribution on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
-    def get_wallet_data(self, wallet: str):
-        """Get wallet data including 7d and 30d metrics for ETH"""
-        url = f"https://gmgn.ai/defi/quotation/v1/smartmoney/eth/walletNew/{wallet}?period=7d"
-        retries = 5
+    def get_wallet_stats(self, wallet: str, period='7d'):
+        """Get the smart money stats of an ETH wallet for a period"""
+        url = f"https://gmgn.ai/defi/quotation/v1/smartmoney/eth/walletNew/{wallet}?period={period}"
+        retry = RetryPolicy(5)
         
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
                 response = self.sendRequest.get(url, headers=self.headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data['msg'] == "success":
-                        wallet_data = data['data']
-                        
-                        
-                        url_30d = f"https://gmgn.ai/defi/quotation/v1/smartmoney/eth/walletNew/{wallet}?period=30d"
-                        response_30d = self.sendRequest.get(url_30d, headers=self.headers)
-                        data_30d = response_30d.json()['data']
-                        
-                        
-                        token_distribution_30d = self.get_token_distribution(wallet, '30d')
-                        token_distribution_7d = self.get_token_distribution(wallet, '7d')
-                        
-                        return self.process_wallet_data(wallet, wallet_data, data_30d, token_distribution_7d, token_distribution_30d)
+                        return data['data']
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching wallet data on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
+    def get_wallet_data(self, wallet: str, deadline=DEFAULT_DEADLINE):
+        """Get wallet data including 7d and 30d metrics for ETH
+
+        The lookups run concurrently. Anything but the 7d stats that has not
+        answered by the deadline is left out of the result.
+        """
+        results = gather({
+            "wallet_7d": lambda: self.get_wallet_stats(wallet, '7d'),
+            "wallet_30d": lambda: self.get_wallet_stats(wallet, '30d'),
+            "distribution_7d": lambda: self.get_token_distribution(wallet, '7d'),
+            "distribution_30d": lambda: self.get_token_distribution(wallet, '30d')
+        }, deadline, required=("wallet_7d",))
+        if results["wallet_7d"] is None:
+            return None
+        return self.process_wallet_data(
+            wallet,
+            results["wallet_7d"],
+            results["wallet_30d"] or {},
+            results["distribution_7d"],
+            results["distribution_30d"]
+        )
+
     def process_wallet_data(self, wallet, data, data_30d, token_distro_7d, token_distro_30d):
         """Process ETH wallet data into a formatted response"""
         try:
@@ -133,7 +89,7 @@ class EthWalletCheckerService:
             print(f"Error processing wallet data: {e}")
             return None
 
-    def check_eth_wallets(self, wallets, max_threads=5):
+    def check_eth_wallets(self, wallets, max_threads=5, progress=None):
         """Check multiple ETH wallets"""
         if isinstance(wallets, str):
             wallets = [addr.strip() for addr in wallets.split(',')]
@@ -145,12 +101,14 @@ class EthWalletCheckerService:
                 for wallet in wallets
             }
             
-            for future in as_completed(futures):
+            for done, future in enumerate(as_completed(futures), 1):
                 try:
                     data = future.result()
                     if data:
                         results.append(data)
                 except Exception as e:
                     print(f"Error processing wallet: {e}")
+                if progress:
+                    progress(done, len(futures))
                     
         return results 
\ No newline at end of file
@@ -0,0 +1,85 @@
+import math
+import time
+import random
+import threading
+
+
+class FingerprintScore:
+    """Decaying success rate and latency for one fingerprint"""
+
+    def __init__(self, success: float, latency: float):
+        self.success = success
+        self.latency = latency
+        self.samples = 0
+        self.updated = time.monotonic()
+
+
+class FingerprintHealth:
+    """Scores TLS identifiers by how upstreams treat them
+
+    Every identifier travels with one fixed user agent (see fingerprints), so
+    its score covers the user agent too. Each outcome moves an exponentially weighted success rate and latency.
+    Scores drift back to the prior with half_life of inactivity, so a
+    fingerprint that was challenged earlier is tried again later, and an
+    exploration share of choices ignores the scores entirely.
+    """
+
+    def __init__(self, alpha: float = 0.2, half_life: float = 600, exploration: float = 0.1,
+                 prior_success: float = 0.9, prior_latency: float = 1.0):
+        self.alpha = alpha
+        self.half_life = half_life
+        self.exploration = exploration
+        self.prior_success = prior_success
+        self.prior_latency = prior_latency
+        self._scores = {}
+        self._lock = threading.Lock()
+
+    def _score(self, kind: str, name: str, now: float):
+        """The decayed score for a fingerprint; the lock must be held"""
+        score = self._scores.get((kind, name))
+        if score is None:
+            score = FingerprintScore(self.prior_success, self.prior_latency)
+            self._scores[(kind, name)] = score
+        else:
+            keep = math.pow(0.5, (now - score.updated) / self.half_life)
+            score.success = self.prior_success + (score.success - self.prior_success) * keep
+            score.latency = self.prior_latency + (score.latency - self.prior_latency) * keep
+        score.updated = now
+        return score
+
+    def _weight(self, score: FingerprintScore):
+        # Challenges cost a retry or a fallback, so they weigh more than latency
+        return score.success ** 2 / (1 + score.latency)
+
+    def record(self, kind: str, name: str, success: bool, latency: float = None):
+        with self._lock:
+            score = self._score(kind, name, time.monotonic())
+            score.success += self.alpha * ((1.0 if success else 0.0) - score.success)
+            if latency is not None:
+                score.latency += self.alpha * (latency - score.latency)
+            score.samples += 1
+
+    def choose(self, kind: str, candidates):
+        """Pick a candidate, biased toward the healthiest"""
+        candidates = list(candidates)
+        if len(candidates) == 1 or random.random() < self.exploration:
+            return random.choice(candidates)
+        with self._lock:
+            now = time.monotonic()
+            weights = [self._weight(self._score(kind, name, now)) for name in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            stats = {}
+            for kind, name in list(self._scores):
+                score = self._score(kind, name, now)
+                if not score.samples:
+                    continue
+                stats.setdefault(kind, {})[name] = {
+                    "success": round(score.success, 3),
+                    "latency": round(score.latency, 3),
+                    "samples": score.samples
+                }
+            return stats
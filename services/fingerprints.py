@@ -0,0 +1,68 @@
+import threading
+
+CHROME_UA = 'Mozilla/5.0 ({platform}) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{version}.0.0.0 Safari/537.36'
+FIREFOX_UA = 'Mozilla/5.0 ({platform}; rv:{version}.0) Gecko/20100101 Firefox/{version}.0'
+SAFARI_UA = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/{version} Safari/605.1.15'
+OPERA_UA = CHROME_UA + ' OPR/{opera}.0.0.0'
+
+WINDOWS = 'Windows NT 10.0; Win64; x64'
+MAC = 'Macintosh; Intel Mac OS X 10_15_7'
+LINUX = 'X11; Linux x86_64'
+
+
+class FingerprintProfile:
+    """A TLS client identifier and the browser headers that go with it"""
+
+    def __init__(self, identifier: str, user_agent: str, headers=None):
+        self.identifier = identifier
+        self.user_agent = user_agent
+        self.headers = {'user-agent': user_agent, **(headers or {})}
+
+
+def chromium_hints(brand: str, version: int, platform: str, chromium: int = None):
+    """Client hints for a Chromium-based browser; chromium defaults to the brand version"""
+    return {
+        'sec-ch-ua': f'"{brand}";v="{version}", "Chromium";v="{chromium or version}", "Not_A Brand";v="24"',
+        'sec-ch-ua-mobile': '?0',
+        'sec-ch-ua-platform': f'"{platform}"'
+    }
+
+
+# Every user agent claims the same browser and version as the TLS handshake
+# it travels with, so upstreams never see a firefox UA over a chrome hello.
+FINGERPRINT_CATALOG = [
+    FingerprintProfile('chrome_110', CHROME_UA.format(platform=WINDOWS, version=110),
+                       chromium_hints('Google Chrome', 110, 'Windows')),
+    FingerprintProfile('chrome_112', CHROME_UA.format(platform=LINUX, version=112),
+                       chromium_hints('Google Chrome', 112, 'Linux')),
+    FingerprintProfile('chrome_117', CHROME_UA.format(platform=MAC, version=117),
+                       chromium_hints('Google Chrome', 117, 'macOS')),
+    FingerprintProfile('chrome_120', CHROME_UA.format(platform=WINDOWS, version=120),
+                       chromium_hints('Google Chrome', 120, 'Windows')),
+    FingerprintProfile('firefox_110', FIREFOX_UA.format(platform=LINUX, version=110)),
+    FingerprintProfile('firefox_117', FIREFOX_UA.format(platform=WINDOWS, version=117)),
+    FingerprintProfile('firefox_120', FIREFOX_UA.format(platform=LINUX, version=120)),
+    FingerprintProfile('safari_15_6_1', SAFARI_UA.format(version='15.6.1')),
+    FingerprintProfile('safari_16_0', SAFARI_UA.format(version='16.0')),
+    FingerprintProfile('opera_90', OPERA_UA.format(platform=WINDOWS, version=104, opera=90),
+                       chromium_hints('Opera', 90, 'Windows', chromium=104)),
+    FingerprintProfile('opera_91', OPERA_UA.format(platform=WINDOWS, version=105, opera=91),
+                       chromium_hints('Opera', 91, 'Windows', chromium=105)),
+]
+
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def available_profiles():
+    """Catalog entries whose identifier the installed tls_client supports, by identifier"""
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                # Loaded on first use so importing the app stays cheap
+                import tls_client
+                supported = set(tls_client.settings.ClientIdentifiers.__args__)
+                profiles = [profile for profile in FINGERPRINT_CATALOG if profile.identifier in supported]
+                _profiles = {profile.identifier: profile for profile in profiles or FINGERPRINT_CATALOG}
+    return _profiles
@@ -1,34 +1,10 @@
-import time
-import random
-import tls_client
-from fake_useragent import UserAgent
+from .base_service import BaseService
+from .retry_policy import RetryPolicy
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-class GMGNService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=0, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random
-        }
+class GMGNService(BaseService):
+    accept = 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8'
+    priority = 'u=0, i'
 
     def get_url_for_type(self, token_type: str, site: str):
         """Get the appropriate URL based on token type and site"""
@@ -58,10 +34,10 @@ class GMGNService:
         if not url:
             return []
 
-        retries = 3
+        retry = RetryPolicy(3)
         contracts = set()
 
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
                 response = self.sendRequest.get(url, headers=self.headers)
@@ -77,9 +53,10 @@ class GMGNService:
                             if address := item.get('address'):
                                 contracts.add(address)
                     break
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching contracts on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
 
         return list(contracts)
 
@@ -87,6 +64,8 @@ class GMGNService:
         """Get token contracts with concurrent processing"""
         all_contracts = set()
         
+        # Identical concurrent fetches are coalesced by the shared HttpClient,
+        # so the extra workers only add retry headroom, not upstream calls
         with ThreadPoolExecutor(max_workers=max_threads) as executor:
             futures = [
                 executor.submit(self.fetch_contracts, token_type, site) 
@@ -0,0 +1,71 @@
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Recent upstream latencies per endpoint family"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, family: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(family)
+            if samples is None:
+                samples = self._samples[family] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, family: str, pct: float):
+        """Latency below which pct% of recent calls finished, None until warmed up"""
+        with self._lock:
+            samples = sorted(self._samples.get(family, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * pct / 100))
+        return samples[index]
+
+
+class HedgeBudget:
+    """Caps hedges to a fraction of hedgeable requests
+
+    Every request earns ratio of a token (up to burst) and every hedge spends
+    a whole one, so hedging can never add more than ratio extra load.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+
+    def deposit(self):
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self):
+        """Take a token for a hedge, False when the budget is spent"""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+    def won(self):
+        with self._lock:
+            self.wins += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.wins
+            }
@@ -0,0 +1,315 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+from .response_cache import ResponseCache, CachedResponse, is_success
+from .single_flight import SingleFlight
+from .rate_limiter import RateLimiter
+from .circuit_breaker import CircuitBreakers, CircuitOpenError, is_failure
+from .endpoints import endpoint_family
+from .hedging import LatencyTracker, HedgeBudget
+from .fingerprint_health import FingerprintHealth
+from .clearance_store import ClearanceStore
+from .scraper_pool import ScraperPool
+from .fingerprints import FingerprintProfile, available_profiles
+
+
+# Status codes that mean the current fingerprint has been challenged or throttled
+BLOCK_STATUS_CODES = (403, 429)
+
+# Requests allowed in flight against a single upstream host, per process
+MAX_CONCURRENCY_PER_HOST = int(os.environ.get('UPSTREAM_MAX_CONCURRENCY', 16))
+
+
+class PooledSession:
+    """A warm tls_client session plus the bookkeeping used to rotate it"""
+
+    def __init__(self, profile: FingerprintProfile, timeout_seconds: int):
+        # Loaded on first use so importing the app stays cheap
+        import tls_client
+        self.profile = profile
+        self.identifier = profile.identifier
+        self.session = tls_client.Session(
+            random_tls_extension_order=True,
+            client_identifier=profile.identifier
+        )
+        self.session.timeout_seconds = timeout_seconds
+        self.created_at = time.monotonic()
+        self.uses = 0
+        self.blocked = False
+
+    def is_stale(self, max_uses: int, max_age: float):
+        """Whether the session is due for rotation"""
+        return (
+            self.blocked
+            or self.uses >= max_uses
+            or time.monotonic() - self.created_at >= max_age
+        )
+
+
+class SessionPool:
+    """Keeps warm fingerprinted sessions for a single upstream host"""
+
+    def __init__(self, host: str, size: int = 8, max_uses: int = 200,
+                 max_age: float = 600, timeout_seconds: int = 60,
+                 max_concurrency: int = 16, health: FingerprintHealth = None):
+        self.host = host
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.timeout_seconds = timeout_seconds
+        self.health = health or FingerprintHealth()
+        self._idle = []
+        self._lock = threading.Lock()
+        # Process-wide cap on requests in flight against this host
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def _new_session(self):
+        profiles = available_profiles()
+        identifier = self.health.choose('identifier', profiles)
+        return PooledSession(profiles[identifier], self.timeout_seconds)
+
+    def acquire(self):
+        """Take an idle session, creating a new one when none is warm"""
+        with self._lock:
+            while self._idle:
+                pooled = self._idle.pop()
+                if not pooled.is_stale(self.max_uses, self.max_age):
+                    return pooled
+        return self._new_session()
+
+    def release(self, pooled: PooledSession):
+        """Return a session to the pool, dropping it if it must be rotated"""
+        if pooled.is_stale(self.max_uses, self.max_age):
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(pooled)
+
+    @contextmanager
+    def lease(self):
+        with self._slots:
+            pooled = self.acquire()
+            try:
+                yield pooled
+            finally:
+                pooled.uses += 1
+                self.release(pooled)
+
+
+class HttpClient:
+    """Process-wide entry point for upstream HTTP calls, one session pool per host"""
+
+    def __init__(self, pool_size: int = 8, max_uses: int = 200, max_age: float = 600,
+                 timeout_seconds: int = 60, max_concurrency_per_host: int = MAX_CONCURRENCY_PER_HOST,
+                 hedge_percentile: float = 95, hedge_ratio: float = 0.1):
+        self.pool_size = pool_size
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.timeout_seconds = timeout_seconds
+        self.cache = ResponseCache()
+        self.inflight = SingleFlight()
+        self.limiter = RateLimiter()
+        self.breakers = CircuitBreakers()
+        self.latency = LatencyTracker()
+        self.health = FingerprintHealth()
+        self.clearance = ClearanceStore()
+        self.scrapers = ScraperPool()
+        self.hedge_percentile = hedge_percentile
+        self.hedges = HedgeBudget(ratio=hedge_ratio)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix='hedge')
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def pool(self, host: str):
+        """Get (or lazily create) the session pool for a host"""
+        with self._lock:
+            pool = self._pools.get(host)
+            if pool is None:
+                pool = SessionPool(
+                    host,
+                    size=self.pool_size,
+                    max_uses=self.max_uses,
+                    max_age=self.max_age,
+                    timeout_seconds=self.timeout_seconds,
+                    max_concurrency=self.max_concurrency_per_host,
+                    health=self.health
+                )
+                self._pools[host] = pool
+            return pool
+
+    @contextmanager
+    def lease(self, url: str):
+        """Lease a pooled session for the host of the given url"""
+        with self.pool(urlsplit(url).hostname).lease() as pooled:
+            yield pooled
+
+    def get(self, url: str, headers=None, hedge: bool = False, validate=is_success, **kwargs):
+        """Send a GET request, answering from the response cache when fresh
+
+        A 200 response is only cached once validate(response) accepts it, so a
+        body the caller would reject is refetched on its next attempt instead
+        of being served back from the cache.
+        Concurrent callers for the same normalized url share one upstream fetch.
+        While the endpoint's circuit is open a stale cached copy is served if
+        one is still held, otherwise CircuitOpenError is raised. With hedge a
+        slow request is raced against a duplicate on another session.
+        """
+        key = self.cache.key(url)
+        ttl = self.cache.ttl_for(url)
+        if ttl != 0:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            return self.inflight.do(key, self._fetch, url, headers, key, ttl, hedge, validate, **kwargs)
+        except CircuitOpenError:
+            stale = self.cache.get_stale(key) if ttl != 0 else None
+            if stale is None:
+                raise
+            return stale
+
+    def _fetch(self, url: str, headers, key: str, ttl, hedge: bool, validate, **kwargs):
+        response = self._send(url, headers, hedge, **kwargs)
+        # Populate the cache before the in-flight slot is released so late
+        # arrivals find the entry instead of starting a second fetch
+        if ttl != 0 and response.status_code == 200 and self._valid(validate, response):
+            self.cache.set(key, CachedResponse.from_response(response), ttl)
+        return response
+
+    @staticmethod
+    def _valid(validate, response):
+        if validate is None:
+            return True
+        try:
+            return bool(validate(response))
+        except Exception:
+            return False
+
+    def _send(self, url: str, headers=None, hedge: bool = False, **kwargs):
+        """Send a GET request over a pooled session for the url's host"""
+        breaker = self.breakers.for_url(url)
+        breaker.check()
+        success = False
+        try:
+            if hedge:
+                response = self._send_hedged(url, headers, **kwargs)
+            else:
+                response = self._attempt(url, headers, **kwargs)
+            success = not is_failure(response.status_code)
+            return response
+        finally:
+            breaker.record(success)
+
+    def _attempt(self, url: str, headers=None, leased: threading.Event = None, **kwargs):
+        host = urlsplit(url).hostname
+        # Wait for the rate limiter before taking one of the host's slots
+        self.limiter.acquire(url)
+        with self.lease(url) as pooled:
+            if leased is not None:
+                leased.set()
+            # The session's profile decides the browser headers so they always
+            # match its TLS handshake
+            headers = {**(headers or {}), **pooled.profile.headers}
+            user_agent = pooled.profile.user_agent
+            self.clearance.seed(host, user_agent, pooled.session.cookies)
+            started = time.monotonic()
+            try:
+                response = pooled.session.get(url, headers=headers, **kwargs)
+            except Exception:
+                self.health.record('identifier', pooled.identifier, False)
+                raise
+            elapsed = time.monotonic() - started
+            self.latency.record(endpoint_family(url), elapsed)
+            if response.status_code in BLOCK_STATUS_CODES:
+                pooled.blocked = True
+                # Challenged despite the clearance we sent, so it is no longer good
+                if response.status_code == 403:
+                    self.clearance.invalidate(host, user_agent)
+            else:
+                self.clearance.harvest(host, user_agent, pooled.session.cookies)
+            self.health.record('identifier', pooled.identifier, not pooled.blocked, elapsed)
+            return response
+
+    def fallback_get(self, url: str, headers=None, **kwargs):
+        """Send a GET request through the long-lived cloudscraper pool
+
+        Used when the pooled tls_client sessions keep failing. It honours the
+        same circuit breaker and rate limits as get(), and keeps its own
+        clearance cookies across requests.
+        """
+        breaker = self.breakers.for_url(url)
+        breaker.check()
+        host = urlsplit(url).hostname
+        success = False
+        try:
+            self.limiter.acquire(url)
+            with self.scrapers.lease() as scraper:
+                # cloudscraper picks a browser and its headers itself; keep them
+                user_agent = scraper.headers.get('User-Agent')
+                self.clearance.seed(host, user_agent, scraper.cookies)
+                kwargs.setdefault('timeout', self.timeout_seconds)
+                response = scraper.get(url, headers={**(headers or {}), 'user-agent': user_agent}, **kwargs)
+                if response.status_code not in BLOCK_STATUS_CODES:
+                    self.clearance.harvest(host, user_agent, scraper.cookies)
+            success = not is_failure(response.status_code)
+            return response
+        finally:
+            breaker.record(success)
+
+    def _send_hedged(self, url: str, headers=None, **kwargs):
+        """Race a duplicate request once the first outlives recent latency
+
+        The duplicate leases its own session, so it goes out on a different
+        fingerprint than the straggler. Whichever answers first wins and the
+        other is left to finish in the background. The hedge delay is only
+        timed from the moment the first request holds a session: queueing on
+        the executor, the rate limiter or the host's slots is local, and a
+        duplicate would only wait in the same queues.
+        """
+        self.hedges.deposit()
+        leased = threading.Event()
+        first = self._hedge_executor.submit(self._attempt, url, headers, leased, **kwargs)
+        # A request that fails before it gets a session must not leave us waiting
+        first.add_done_callback(lambda _: leased.set())
+        delay = self.latency.percentile(endpoint_family(url), self.hedge_percentile)
+        if delay is None:
+            return first.result()
+        leased.wait()
+        try:
+            return first.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        if not self.hedges.withdraw():
+            return first.result()
+
+        second = self._hedge_executor.submit(self._attempt, url, headers, **kwargs)
+        pending = [first, second]
+        while True:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                # A failed attempt only counts once the other one is settled too
+                if future.exception() is None or not pending:
+                    if future is second:
+                        self.hedges.won()
+                    return future.result()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the shared HttpClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -0,0 +1,97 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """A unit of background work and its observable state"""
+
+    def __init__(self, job_type: str):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.status = 'queued'
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def progress(self, done: int, total: int = None):
+        """Progress callback handed to the service doing the work"""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "progress": {
+                "done": self.done,
+                "total": self.total
+            },
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobManager:
+    """Runs heavy requests on a local worker pool, off the HTTP request path
+
+    Finished jobs keep their result for result_ttl seconds before they are
+    dropped.
+    """
+
+    def __init__(self, max_workers: int = 4, result_ttl: float = 3600):
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+
+    def submit(self, job_type: str, fn, *args, **kwargs):
+        """Queue fn(*args, progress=..., **kwargs) and return its Job"""
+        job = Job(job_type)
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, progress=job.progress, **kwargs)
+            status = 'succeeded'
+        except Exception as e:
+            print(f"Job {job.id} ({job.type}) failed: {e}")
+            job.error = str(e)
+            status = 'failed'
+        # Stamp the finish time first: once the status says finished, other
+        # threads may purge the job by it
+        job.finished_at = time.time()
+        job.status = status
+
+    def _purge(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,28 @@
+import threading
+
+
+class LazyService:
+    """Stands in for a service and builds it on first use
+
+    Attribute access is forwarded to the real instance, which is created
+    once per process the first time anything asks for it.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -0,0 +1,64 @@
+from bisect import bisect_right
+
+# Bucket edges in percent. Every bucket includes its lower edge and excludes
+# its upper one, so each PnL lands in exactly one bucket.
+DEFAULT_EDGES = (-50, 0, 50, 200, 500, 600)
+DEFAULT_LABELS = (
+    "-50% +",
+    "0% - -50%",
+    "0 - 50%",
+    "50% - 199%",
+    "200% - 499%",
+    "500% - 600%",
+    "600% +"
+)
+
+
+class PnlDistribution:
+    """Bins per-token PnL into the buckets shown for a wallet"""
+
+    def __init__(self, edges=DEFAULT_EDGES, labels=DEFAULT_LABELS):
+        edges = tuple(edges)
+        labels = tuple(labels)
+        if list(edges) != sorted(set(edges)):
+            raise ValueError("Bucket edges must be strictly increasing")
+        if len(labels) != len(edges) + 1:
+            raise ValueError("There must be exactly one more label than bucket edges")
+        self.edges = edges
+        self.labels = labels
+
+    def bin(self, percentages):
+        """Bucket index of each PnL percentage, like numpy.digitize"""
+        edges = self.edges
+        return [bisect_right(edges, value) for value in percentages]
+
+    def distribute(self, tokens, total_field: str = None):
+        """Count a wallet's tokens per bucket by their total_profit_pnl
+
+        With total_field, e.g. 'total_profit', the per-bucket sums of that
+        field are returned alongside as {"counts": ..., "totals": ...}.
+        """
+        tokens = [token for token in tokens if token.get('total_profit_pnl') is not None]
+        indexes = self.bin([token['total_profit_pnl'] * 100 for token in tokens])
+
+        counts = [0] * len(self.labels)
+        for index in indexes:
+            counts[index] += 1
+        distribution = dict(zip(self.labels, counts))
+        if total_field is None:
+            return distribution
+
+        totals = [0.0] * len(self.labels)
+        for index, token in zip(indexes, tokens):
+            totals[index] += float(token.get(total_field) or 0)
+        return {"counts": distribution, "totals": dict(zip(self.labels, totals))}
+
+    def distribute_many(self, tokens_by_wallet, total_field: str = None):
+        """Distribute several wallets at once, keyed like the input"""
+        return {
+            wallet: self.distribute(tokens, total_field)
+            for wallet, tokens in tokens_by_wallet.items()
+        }
+
+
+pnl_distribution = PnlDistribution()
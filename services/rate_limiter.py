@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+from .endpoints import endpoint_family
+
+# key -> (requests per second, burst). Keys are a host or a 'host/family' from
+# endpoint_family(); a request takes a token from each bucket that applies.
+# UPSTREAM_RATE_LIMITS may hold a JSON object overriding or extending these.
+DEFAULT_RATE_LIMITS = {
+    'gmgn.ai': (8, 16),
+    'gmgn.ai/trades': (4, 8),
+    'api.solana.fm': (10, 20),
+}
+
+# Point every worker process at the same file to share the buckets between them
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE')
+
+
+class TokenBucket:
+    """In-process token bucket"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token if one is available, otherwise return the wait until one is"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket kept in SQLite so several worker processes draw from it"""
+
+    def __init__(self, path: str, key: str, rate: float, burst: float):
+        super().__init__(rate, burst)
+        self.path = path
+        self.key = key
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS rate_buckets "
+                    "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+                )
+        finally:
+            connection.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _take(self):
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = connection.execute(
+                "SELECT tokens, updated FROM rate_buckets WHERE key = ?", (self.key,)
+            ).fetchone()
+            tokens = self.burst if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (self.key, tokens, now)
+            )
+            connection.execute("COMMIT")
+            return wait
+        except sqlite3.Error as e:
+            # Never let the limiter's own storage take requests down with it
+            print(f"Shared rate limiter unavailable, using local bucket: {e}")
+            return super()._take()
+        finally:
+            connection.close()
+
+
+class RateLimiter:
+    """Process-wide (optionally cross-process) rate limiting per host and endpoint family"""
+
+    def __init__(self, limits=None, store_path=RATE_LIMIT_STORE):
+        if limits is None:
+            limits = dict(DEFAULT_RATE_LIMITS)
+            if os.environ.get('UPSTREAM_RATE_LIMITS'):
+                limits.update(json.loads(os.environ['UPSTREAM_RATE_LIMITS']))
+        self.limits = limits
+        self.store_path = store_path
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str):
+        with self._lock:
+            if key not in self._buckets:
+                limit = self.limits.get(key)
+                if limit is None:
+                    bucket = None
+                elif self.store_path:
+                    bucket = SharedTokenBucket(self.store_path, key, *limit)
+                else:
+                    bucket = TokenBucket(*limit)
+                self._buckets[key] = bucket
+            return self._buckets[key]
+
+    def acquire(self, url: str):
+        """Block until the url's host and endpoint family both allow another request"""
+        host = (urlsplit(url).hostname or '').lower()
+        family = endpoint_family(url)
+        for key in dict.fromkeys((host, family)):
+            bucket = self._bucket(key)
+            if bucket is not None:
+                bucket.acquire()
@@ -0,0 +1,186 @@
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+# (pattern on host + path, ttl in seconds). The first match wins, None keeps an
+# entry until it is evicted and URLs matching no policy are never cached.
+DEFAULT_POLICIES = [
+    (r'gmgn\.ai/defi/quotation/v1/trades/', 5),
+    (r'gmgn\.ai/vas/api/v1/token_trades/', 5),
+    (r'gmgn\.ai/defi/quotation/v1/rank/\w+/(pump|moonshot)/', 10),
+    (r'gmgn\.ai/defi/quotation/v1/pairs/', 10),
+    (r'gmgn\.ai/defi/quotation/v1/tokens/top_(traders|holders)/', 30),
+    (r'gmgn\.ai/api/v1/wallet_holdings/', 30),
+    (r'gmgn\.ai/defi/quotation/v1/smartmoney/', 60),
+    (r'gmgn\.ai/defi/quotation/v1/rank/\w+/wallets/', 60),
+    (r'gmgn\.ai/api/v1/wallet_stat/', 60),
+    (r'gmgn\.ai/defi/quotation/v1/tokens/\w+/', 300),
+]
+
+
+def is_success(response):
+    """Whether a response body is JSON that does not report an upstream error
+
+    gmgn answers throttling and bad requests with a 200 whose code or msg
+    says otherwise; such bodies must never be cached.
+    """
+    try:
+        body = response.json()
+    except Exception:
+        return False
+    if isinstance(body, dict):
+        if body.get('code', 0) != 0:
+            return False
+        if 'msg' in body and body['msg'] != "success":
+            return False
+    return True
+
+
+def has_data(response):
+    """Like is_success, but the body's data must also be non-empty"""
+    if not is_success(response):
+        return False
+    body = response.json()
+    return isinstance(body, dict) and bool(body.get('data'))
+
+
+class CachedResponse:
+    """Snapshot of a successful upstream response that can be served again"""
+
+    def __init__(self, status_code: int, content: bytes, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = dict(headers or {})
+
+    @classmethod
+    def from_response(cls, response):
+        content = response.content
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return cls(response.status_code, content, response.headers)
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        # Parse on every call so callers never share (and mutate) one object
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """Bounded TTL + LRU cache for upstream GET responses and derived values
+
+    Expired entries linger for stale_for seconds so get_stale() can still
+    answer while an upstream is unavailable.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024,
+                 policies=None, stale_for: float = 600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_for = stale_for
+        self.policies = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (DEFAULT_POLICIES if policies is None else policies)
+        ]
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(url: str):
+        """Normalize a url so equivalent requests share one entry"""
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        key = f"{parts.scheme.lower()}://{(parts.hostname or '').lower()}{parts.path}"
+        return f"{key}?{query}" if query else key
+
+    def ttl_for(self, url: str):
+        """TTL for a url: seconds, None for permanent, 0 when it must not be cached"""
+        parts = urlsplit(url)
+        target = f"{(parts.hostname or '').lower()}{parts.path}"
+        for pattern, ttl in self.policies:
+            if pattern.search(target):
+                return ttl
+        return 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            now = time.monotonic()
+            if expires_at is not None and expires_at <= now:
+                if expires_at + self.stale_for <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key: str):
+        """Return an entry even if it has expired, as long as it is still held"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at + self.stale_for <= time.monotonic():
+                return None
+            return value
+
+    def set(self, key: str, value, ttl=None, size: int = None):
+        """Store a value; ttl None keeps it until evicted"""
+        if size is None:
+            size = len(getattr(value, 'content', b'')) + len(key)
+        if size > self.max_bytes:
+            return
+
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
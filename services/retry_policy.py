@@ -0,0 +1,69 @@
+import time
+import random
+from email.utils import parsedate_to_datetime
+
+# Throttling, Cloudflare challenges (a fresh fingerprint may pass) and
+# transient upstream/edge failures are worth another attempt
+RETRYABLE_STATUS_CODES = {403, 408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Paces the attempts of one upstream fetch loop
+
+    Iterate it in place of range(retries) and report each failed attempt with
+    failed(). Before the next attempt it sleeps with decorrelated jitter,
+    honours Retry-After, and ends the loop early when the last failure cannot
+    succeed on a retry (e.g. a 404). An attempt that neither succeeds nor
+    reports a failure is treated as a retryable one.
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0,
+                 max_retry_after: float = 30.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def __iter__(self):
+        delay = self.base_delay
+        for attempt in range(self.attempts):
+            if attempt:
+                if not self._retryable:
+                    return
+                # Decorrelated jitter keeps concurrent workers from retrying in lockstep
+                delay = min(self.max_delay, random.uniform(self.base_delay, delay * 3))
+                wait = delay
+                if self._retry_after is not None:
+                    wait = max(wait, min(self._retry_after, self.max_retry_after))
+                time.sleep(wait)
+
+            self._retryable = True
+            self._retry_after = None
+            yield attempt
+
+    def failed(self, response=None, error=None):
+        """Record why the current attempt failed"""
+        if response is not None:
+            status = response.status_code
+            self._retryable = status == 200 or status in RETRYABLE_STATUS_CODES
+            self._retry_after = retry_after_seconds(response)
+        elif error is not None:
+            self._retryable = getattr(error, 'retryable', True)
@@ -0,0 +1,231 @@
+import os
+import time
+import sqlite3
+import threading
+
+DEFAULT_PATH = os.environ.get('SCAN_STORE_PATH', 'scan_checkpoints.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    contract_address TEXT PRIMARY KEY,
+    cursor TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    pages INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_trades (
+    contract_address TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    wallet TEXT NOT NULL,
+    type TEXT,
+    amount_usd REAL,
+    timestamp INTEGER,
+    PRIMARY KEY (contract_address, tx_hash, wallet)
+);
+CREATE INDEX IF NOT EXISTS scan_trades_by_time
+    ON scan_trades (contract_address, timestamp DESC);
+CREATE TABLE IF NOT EXISTS scan_gaps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contract_address TEXT NOT NULL,
+    cursor TEXT,
+    target TEXT
+);
+"""
+
+
+class ScanCheckpointStore:
+    """SQLite-backed progress of long transaction scans
+
+    Keeps, per contract, the cursor to resume from and every buy collected so
+    far, so an interrupted scan continues where it stopped and a repeated scan
+    only needs the pages newer than what is already stored. Walks that fill in
+    those newer pages are tracked as gaps, each with its own cursor and the
+    stored trade it must reach, so an interrupted one is resumed too.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Streamed reads may be resumed from another worker thread, but a
+        # connection is only ever used by one consumer at a time
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.executescript(SCHEMA)
+                    self._ready = True
+        return connection
+
+    def load(self, contract_address: str):
+        """Checkpoint for a contract, or None if it has never been scanned"""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT cursor, complete, pages FROM scans WHERE contract_address = ?",
+                (contract_address,)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return {"cursor": row[0], "complete": bool(row[1]), "pages": row[2]}
+
+    def complete(self, contract_address: str):
+        """Whether the whole feed is stored: the deep walk finished and no gap is open"""
+        checkpoint = self.load(contract_address)
+        return bool(checkpoint and checkpoint['complete']) and not self.gaps(contract_address)
+
+    def newest_tx_hash(self, contract_address: str):
+        """Hash of the newest stored buy, or None when nothing is stored"""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT tx_hash FROM scan_trades WHERE contract_address = ? "
+                "ORDER BY timestamp DESC, rowid LIMIT 1",
+                (contract_address,)
+            ).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+
+    def gaps(self, contract_address: str):
+        """Open gaps of a contract, oldest first"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT id, cursor, target FROM scan_gaps WHERE contract_address = ? ORDER BY id",
+                (contract_address,)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [{"id": gap_id, "cursor": cursor, "target": target} for gap_id, cursor, target in rows]
+
+    def open_gap(self, contract_address: str, target: str = None):
+        """Record a walk from the newest page down to target (the feed's end when None)"""
+        connection = self._connect()
+        try:
+            with connection:
+                gap_id = connection.execute(
+                    "INSERT INTO scan_gaps (contract_address, cursor, target) VALUES (?, NULL, ?)",
+                    (contract_address, target)
+                ).lastrowid
+        finally:
+            connection.close()
+        return {"id": gap_id, "cursor": None, "target": target}
+
+    def close_gap(self, gap_id: int):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM scan_gaps WHERE id = ?", (gap_id,))
+        finally:
+            connection.close()
+
+    def known_tx_hashes(self, contract_address: str):
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT DISTINCT tx_hash FROM scan_trades WHERE contract_address = ?",
+                (contract_address,)
+            ).fetchall()
+        finally:
+            connection.close()
+        return {row[0] for row in rows}
+
+    def save_page(self, contract_address: str, transactions, cursor=None,
+                  complete: bool = False, advance: bool = True, gap: int = None):
+        """Store a page's buys and move the checkpoint (or, with gap, that gap's cursor) past it
+
+        With advance off the deep walk's checkpoint is left untouched.
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO scan_trades "
+                    "(contract_address, tx_hash, wallet, type, amount_usd, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            contract_address,
+                            tx['tx_hash'],
+                            tx['wallet'],
+                            tx['type'],
+                            tx.get('amount_usd'),
+                            tx.get('timestamp')
+                        )
+                        for tx in transactions
+                    ]
+                )
+                if gap is not None:
+                    connection.execute("UPDATE scan_gaps SET cursor = ? WHERE id = ?", (cursor, gap))
+                if advance:
+                    connection.execute(
+                        "INSERT INTO scans (contract_address, cursor, complete, pages, updated_at) "
+                        "VALUES (?, ?, ?, 1, ?) "
+                        "ON CONFLICT(contract_address) DO UPDATE SET "
+                        "cursor = excluded.cursor, complete = excluded.complete, "
+                        "pages = scans.pages + 1, updated_at = excluded.updated_at",
+                        (contract_address, cursor, int(complete), time.time())
+                    )
+        finally:
+            connection.close()
+
+    def transactions(self, contract_address: str):
+        """Every stored buy for a contract, newest first"""
+        return [
+            transaction
+            for batch in self.iter_transactions(contract_address)
+            for transaction in batch
+        ]
+
+    def iter_transactions(self, contract_address: str, batch_size: int = 500):
+        """Stored buys for a contract in batches, newest first"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT wallet, tx_hash, type, amount_usd, timestamp FROM scan_trades "
+                "WHERE contract_address = ? ORDER BY timestamp DESC, rowid",
+                (contract_address,)
+            )
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield [
+                    {
+                        "wallet": wallet,
+                        "tx_hash": tx_hash,
+                        "type": tx_type,
+                        "amount_usd": amount_usd,
+                        "timestamp": timestamp
+                    }
+                    for wallet, tx_hash, tx_type, amount_usd, timestamp in batch
+                ]
+        finally:
+            connection.close()
+
+    def counts(self, contract_address: str):
+        """(stored buys, distinct buyers) for a contract"""
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT wallet) FROM scan_trades WHERE contract_address = ?",
+                (contract_address,)
+            ).fetchone()
+        finally:
+            connection.close()
+
+    def reset(self, contract_address: str):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM scan_trades WHERE contract_address = ?", (contract_address,))
+                connection.execute("DELETE FROM scans WHERE contract_address = ?", (contract_address,))
+                connection.execute("DELETE FROM scan_gaps WHERE contract_address = ?", (contract_address,))
+        finally:
+            connection.close()
@@ -0,0 +1,34 @@
+import threading
+from contextlib import contextmanager
+
+
+class ScraperPool:
+    """Long-lived cloudscraper sessions used as the fallback transport
+
+    Scrapers are kept between requests so a solved challenge (and the
+    cookies that come with it) is reused instead of solved again for every
+    failed attempt. Each scraper serves one request at a time.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _new_scraper(self):
+        # Imported lazily, only processes that fall back pay for cloudscraper
+        import cloudscraper
+        return cloudscraper.create_scraper()
+
+    @contextmanager
+    def lease(self):
+        with self._lock:
+            scraper = self._idle.pop() if self._idle else None
+        if scraper is None:
+            scraper = self._new_scraper()
+        try:
+            yield scraper
+        finally:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(scraper)
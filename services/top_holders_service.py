@@ -1,46 +1,24 @@
 import json
-import time
-import random
-import tls_client
-from fake_useragent import UserAgent
+from .base_service import BaseService
+from .concurrency import map_bounded, DEFAULT_MAX_WORKERS
+from .retry_policy import RetryPolicy
+from .response_cache import has_data
 
-class TopHoldersService:
+class TopHoldersService(BaseService):
     def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
+        super().__init__()
         
         self.excluded_addresses = [
             "5Q544fKrFoe6tsEbD7S8EmxGTJYAKtTVhAW5Q5pge4j1",
             "TSLvdd1pWpHVjahSpsvCXUbgwsL3JAcvokwaKt1eokM"
         ]
         
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random
-        }
-
     def get_bonding_curve(self, contract_address: str):
         """Get bonding curve address for a contract"""
         url = f"https://gmgn.ai/defi/quotation/v1/tokens/sol/{contract_address}"
-        retries = 3
+        retry = RetryPolicy(3)
 
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
                 response = self.sendRequest.get(url, headers=self.headers, allow_redirects=True)
@@ -50,38 +28,41 @@ class TopHoldersService:
                         return data['token']['pool_info']['pool_address']
                     except (KeyError, TypeError):
                         return ""
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching bonding curve on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return ""
 
     def fetch_top_holders(self, contract_address: str):
         """Fetch top holders data for a single contract address"""
         url = f"https://gmgn.ai/defi/quotation/v1/tokens/top_holders/sol/{contract_address}?orderby=unrealized_profit&direction=desc&app_lang=en-US&from_app=gmgn"
-        retries = 3
+        retry = RetryPolicy(3)
 
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
-                response = self.sendRequest.get(url, headers=self.headers, allow_redirects=True)
+                response = self.sendRequest.get(url, headers=self.headers, allow_redirects=True, validate=has_data)
                 if response.status_code == 200:
                     data = response.json().get('data', [])
                     if data:
-                        # Only get bonding curve to exclude it from results
+                        # Only get bonding curve to exclude it from results. Kept
+                        # local so concurrent fetches never share exclusions
+                        excluded_addresses = list(self.excluded_addresses)
                         bonding_curve = self.get_bonding_curve(contract_address)
                         if bonding_curve:
-                            self.excluded_addresses.append(bonding_curve)
+                            excluded_addresses.append(bonding_curve)
                         # Filter out excluded addresses and low value holders
                         return [holder for holder in data 
-                               if holder['address'] not in self.excluded_addresses 
+                               if holder['address'] not in excluded_addresses 
                                and holder.get('cost_cur', 0) >= 50]
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching data on attempt {attempt + 1}: {e}")
+                retry.failed(error=e)
                 
                 try:
-                    import cloudscraper
-                    scraper = cloudscraper.create_scraper()
-                    response = scraper.get(url, headers=self.headers)
+                    response = self.sendRequest.fallback_get(url, headers=self.headers)
                     if response.status_code == 200:
                         data = response.json().get('data', [])
                         if data:
@@ -90,17 +71,16 @@ class TopHoldersService:
                                    and holder.get('cost_cur', 0) >= 50]
                 except Exception as e:
                     print(f"Backup scraper failed: {e}")
-            time.sleep(1)
         return []
 
-    def get_top_holders(self, contract_addresses):
+    def get_top_holders(self, contract_addresses, max_threads=DEFAULT_MAX_WORKERS):
         """Get top holders for multiple contract addresses"""
         if isinstance(contract_addresses, str):
             contract_addresses = [addr.strip() for addr in contract_addresses.split(',')]
         
         all_holders = []
-        for address in contract_addresses:
-            holders = self.fetch_top_holders(address)
-            all_holders.extend(holders)
+        for holders in map_bounded(self.fetch_top_holders, contract_addresses, max_threads):
+            if holders:
+                all_holders.extend(holders)
             
         return all_holders 
\ No newline at end of file
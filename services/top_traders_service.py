@@ -1,70 +1,43 @@
 import json
-import time
-import random
-import tls_client
-from fake_useragent import UserAgent
-
-class TopTradersService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random
-        }
+from .base_service import BaseService
+from .concurrency import map_bounded, DEFAULT_MAX_WORKERS
+from .retry_policy import RetryPolicy
 
+class TopTradersService(BaseService):
     def fetch_top_traders(self, contract_address: str):
         """Fetch top traders data for a single contract address"""
         url = f"https://gmgn.ai/defi/quotation/v1/tokens/top_traders/sol/{contract_address}?orderby=realized_profit&direction=desc&app_lang=en-US&from_app=gmgn"
-        retries = 3
+        retry = RetryPolicy(3)
 
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
                 response = self.sendRequest.get(url, headers=self.headers, allow_redirects=True)
                 if response.status_code == 200:
                     return response.json().get('data', [])
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching data on attempt {attempt + 1}: {e}")
+                retry.failed(error=e)
                 
                 try:
-                    import cloudscraper
-                    scraper = cloudscraper.create_scraper()
-                    response = scraper.get(url, headers=self.headers)
+                    response = self.sendRequest.fallback_get(url, headers=self.headers)
                     if response.status_code == 200:
                         return response.json().get('data', [])
                 except Exception as e:
                     print(f"Backup scraper failed: {e}")
             
-            time.sleep(1)
         
         return []
 
-    def get_top_traders(self, contract_addresses):
+    def get_top_traders(self, contract_addresses, max_threads=DEFAULT_MAX_WORKERS):
         """Get top traders for multiple contract addresses"""
         if isinstance(contract_addresses, str):
             contract_addresses = [addr.strip() for addr in contract_addresses.split(',')]
         
         all_traders = []
-        for address in contract_addresses:
-            traders = self.fetch_top_traders(address)
-            all_traders.extend(traders)
+        for traders in map_bounded(self.fetch_top_traders, contract_addresses, max_threads):
+            if traders:
+                all_traders.extend(traders)
             
         return all_traders 
\ No newline at end of file
@@ -0,0 +1,145 @@
+import re
+import base64
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+
+# Plausible unix epochs, used to tell timestamp cursors apart from offsets
+EPOCH_SECONDS = (1_400_000_000, 4_000_000_000)
+EPOCH_MILLISECONDS = (EPOCH_SECONDS[0] * 1000, EPOCH_SECONDS[1] * 1000)
+
+_NUMBER = re.compile(r'^(\D*)(\d+)(.*)$', re.S)
+
+
+def encode_cursor(raw: str):
+    return base64.b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+class TradeCursor:
+    """Decoded gmgn trades pagination cursor
+
+    The cursor is base64 text whose first number is either a row offset or a
+    trade timestamp. Knowing which lets callers synthesize cursors for pages
+    they have not reached yet instead of discovering them one round-trip at
+    a time.
+    """
+
+    def __init__(self, raw: str, prefix: str, value: int, suffix: str, kind: str):
+        self.raw = raw
+        self.prefix = prefix
+        self.value = value
+        self.suffix = suffix
+        self.kind = kind
+
+    @classmethod
+    def decode(cls, cursor):
+        """Parse a cursor, returning None when it has no recognizable structure"""
+        if not cursor:
+            return None
+        try:
+            raw = base64.b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+        match = _NUMBER.match(raw)
+        if not match:
+            return None
+
+        prefix, digits, suffix = match.groups()
+        value = int(digits)
+        if EPOCH_SECONDS[0] <= value < EPOCH_SECONDS[1]:
+            kind = 'timestamp'
+        elif EPOCH_MILLISECONDS[0] <= value < EPOCH_MILLISECONDS[1]:
+            kind = 'timestamp_ms'
+        else:
+            kind = 'offset'
+        return cls(raw, prefix, value, suffix, kind)
+
+    @property
+    def is_timestamp(self):
+        return self.kind in ('timestamp', 'timestamp_ms')
+
+    def with_value(self, value: int):
+        """Encode a cursor identical to this one but pointing at another value"""
+        return encode_cursor(f"{self.prefix}{int(value)}{self.suffix}")
+
+    def at_timestamp(self, timestamp: int):
+        """Encode a cursor positioned at a unix timestamp in seconds"""
+        if self.kind == 'timestamp_ms':
+            timestamp *= 1000
+        # A trailing tie-breaker belongs to the original position, not this one
+        return encode_cursor(f"{self.prefix}{int(timestamp)}")
+
+
+class TradePaginator:
+    """Walks a newest-first trades feed, fetching ahead wherever cursors can be predicted
+
+    fetch_page(cursor) returns (items, next_cursor) or None on failure, with a
+    cursor of None meaning the first page. Offset cursors are synthesized so
+    up to max_threads pages download in parallel; each prediction is checked
+    against the real "next" cursor of the page before it, and the walk drops
+    back to serial (with one page of prefetch) as soon as a prediction misses.
+    """
+
+    def __init__(self, fetch_page, max_threads: int = 5):
+        self.fetch_page = fetch_page
+        self.max_threads = max(1, int(max_threads))
+
+    def pages(self, cursor=None):
+        """Yield each page's items once, in feed order"""
+        for items, _ in self.walk(cursor):
+            yield items
+
+    def walk(self, cursor=None):
+        """Yield (items, next_cursor) for each page once, in feed order"""
+        # Offsets are predicted relative to where the walk starts, which is
+        # mid-feed when a scan is resumed
+        start = TradeCursor.decode(cursor)
+        base = start.value if start and start.kind == 'offset' else 0
+        with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+            first = self.fetch_page(cursor)
+            if first is None:
+                return
+            items, cursor = first
+            yield items, cursor
+            if not items or not cursor:
+                return
+
+            decoded = TradeCursor.decode(cursor)
+            if self.max_threads > 1 and decoded and decoded.kind == 'offset' and decoded.value > base:
+                cursor = yield from self._predicted(executor, decoded, cursor, base)
+            if cursor:
+                yield from self._serial(executor, cursor)
+
+    def _predicted(self, executor, decoded: TradeCursor, cursor, base: int = 0):
+        """Fetch waves of synthesized offset pages; return the cursor to continue serially from
+
+        decoded is the first "next" cursor and base the offset the walk
+        started from, so their difference is the page size.
+        """
+        step = decoded.value - base
+        index = 1
+        while True:
+            predicted = [decoded.with_value(base + i * step) for i in range(index, index + self.max_threads)]
+            results = executor.map(self.fetch_page, predicted)
+
+            for predicted_cursor, page in zip(predicted, results):
+                actual = TradeCursor.decode(cursor)
+                if page is None or actual is None or actual.raw != TradeCursor.decode(predicted_cursor).raw:
+                    return cursor
+
+                items, cursor = page
+                yield items, cursor
+                if not items or not cursor:
+                    return None
+
+            index += self.max_threads
+
+    def _serial(self, executor, cursor):
+        pending = executor.submit(self.fetch_page, cursor)
+        while pending:
+            page = pending.result()
+            if page is None:
+                return
+            items, cursor = page
+            pending = executor.submit(self.fetch_page, cursor) if items and cursor else None
+            yield items, cursor
@@ -1,112 +1,179 @@
-import random
-import tls_client
-import base64
-from fake_useragent import UserAgent
-from threading import Lock
-import time
-import concurrent.futures
-
-class TransactionScannerService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        self.lock = Lock()
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
+from .base_service import BaseService
+from .trade_cursor import TradePaginator
+from .scan_store import ScanCheckpointStore
+from .retry_policy import RetryPolicy
+from .response_cache import has_data
 
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random
-        }
+class TransactionScannerService(BaseService):
+    def __init__(self):
+        super().__init__()
+        self.store = ScanCheckpointStore()
 
     def fetch_page(self, url: str):
         """Fetch a single page of transaction data"""
-        retries = 3
+        retry = RetryPolicy(3)
         
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
-                response = self.sendRequest.get(url, headers=self.headers)
+                response = self.sendRequest.get(url, headers=self.headers, validate=has_data)
                 if response.status_code == 200:
                     data = response.json()['data']
                     return {
                         'history': data['history'],
                         'next_page': data.get('next')
                     }
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching page on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
-    def scan_transactions(self, contract_address: str, max_threads: int = 5):
-        """Scan all transactions for a contract and collect buyer addresses"""
-        base_url = f"https://gmgn.ai/defi/quotation/v1/trades/sol/{contract_address}?limit=100"
-        urls = []
-        all_transactions = []
-        paginator = None
-        
-        print(f"Collecting transaction pages for {contract_address}...")
+    def fetch_cursor_page(self, contract_address: str, cursor=None):
+        """Fetch one page by cursor as (history, next_cursor)"""
+        url = f"https://gmgn.ai/defi/quotation/v1/trades/sol/{contract_address}?limit=100"
+        if cursor:
+            url = f"{url}&cursor={cursor}"
+        page_data = self.fetch_page(url)
+        if not page_data:
+            return None
+        return page_data['history'], page_data.get('next_page')
 
-        
-        while True:
-            url = f"{base_url}&cursor={paginator}" if paginator else base_url
-            page_data = self.fetch_page(url)
-            
-            if not page_data:
-                break
-                
-            urls.append(url)
-            paginator = page_data.get('next_page')
-            
-            if paginator:
-                print(f"Found page: {base64.b64decode(paginator).decode('utf-8')}")
-            else:
+    def iter_pages(self, contract_address: str, max_threads: int = 5, cursor=None):
+        """Yield (history, next_cursor) for each page of trades once, newest first
+
+        Offset cursors are predicted so up to max_threads pages download in
+        parallel; otherwise the next page is prefetched while the caller
+        processes the current one.
+        """
+        paginator = TradePaginator(
+            lambda page_cursor: self.fetch_cursor_page(contract_address, page_cursor),
+            max_threads
+        )
+        yield from paginator.walk(cursor)
+
+    def process_page(self, history):
+        """Extract buy transactions from one page of trade history"""
+        return [
+            {
+                "wallet": tx['maker'],
+                "tx_hash": tx['tx_hash'],
+                "type": tx['event'],
+                "amount_usd": tx.get('amount_usd'),
+                "timestamp": tx.get('timestamp')
+            }
+            for tx in history
+            if tx['event'] == "buy"
+        ]
+
+    def iter_transactions(self, contract_address: str, max_threads: int = 5, resume: bool = True,
+                          include_stored: bool = True, progress=None):
+        """Run a checkpointed scan, yielding buys in batches as pages are processed
+
+        Pages are processed as they arrive and none is downloaded twice. Progress
+        is checkpointed after every page: an interrupted scan resumes from its
+        last cursor, and a repeated scan only walks the pages newer than the
+        trades already stored, with the stored ones yielded straight from the
+        checkpoint store unless include_stored is off. Pass resume=False to
+        start over. progress, when given, is called with the pages walked.
+        """
+        if not resume:
+            self.store.reset(contract_address)
+
+        checkpoint = self.store.load(contract_address)
+        known_tx_hashes = self.store.known_tx_hashes(contract_address) if checkpoint else set()
+        pages = 0
+
+        print(f"Scanning transaction pages for {contract_address}...")
+
+        if checkpoint is None:
+            # A first scan walks the whole feed from the newest page
+            for history, next_cursor in self.iter_pages(contract_address, max_threads):
+                pages += 1
+                transactions = self.process_page(history)
+                self.store.save_page(
+                    contract_address,
+                    transactions,
+                    next_cursor,
+                    complete=not history or not next_cursor
+                )
+                if progress:
+                    progress(pages)
+                yield transactions
+        else:
+            # Gaps left open by earlier walks that were interrupted
+            pending = self.store.gaps(contract_address)
+
+            # Trades newer than the newest one stored form a fresh gap
+            gap = self.store.open_gap(contract_address, self.store.newest_tx_hash(contract_address))
+            pages = yield from self.fill_gap(contract_address, gap, max_threads, known_tx_hashes, progress, pages)
+
+            if include_stored and known_tx_hashes:
+                for batch in self.store.iter_transactions(contract_address):
+                    yield [tx for tx in batch if tx['tx_hash'] in known_tx_hashes]
+
+            for gap in pending:
+                pages = yield from self.fill_gap(contract_address, gap, max_threads, known_tx_hashes, progress, pages)
+
+            if not checkpoint['complete'] and checkpoint['cursor']:
+                print(f"Resuming scan of {contract_address} after {checkpoint['pages']} pages...")
+                for history, next_cursor in self.iter_pages(contract_address, max_threads, checkpoint['cursor']):
+                    pages += 1
+                    transactions = self.process_page(history)
+                    self.store.save_page(
+                        contract_address,
+                        transactions,
+                        next_cursor,
+                        complete=not history or not next_cursor
+                    )
+                    if progress:
+                        progress(pages)
+                    yield [tx for tx in transactions if tx['tx_hash'] not in known_tx_hashes]
+
+        print(f"Processed {pages} pages for transactions")
+
+    def fill_gap(self, contract_address: str, gap, max_threads: int, known_tx_hashes, progress, pages: int):
+        """Walk one gap newest first, yielding its new buys; returns the pages walked so far
+
+        The gap is closed once the walk reaches the page holding its target
+        trade, or the end of the feed. A walk cut short by a failed page keeps
+        the gap open at its last cursor for the next scan to resume.
+        """
+        for history, next_cursor in self.iter_pages(contract_address, max_threads, gap['cursor']):
+            pages += 1
+            transactions = self.process_page(history)
+            self.store.save_page(contract_address, transactions, next_cursor, advance=False, gap=gap['id'])
+            if progress:
+                progress(pages)
+            yield [tx for tx in transactions if tx['tx_hash'] not in known_tx_hashes]
+            if not history or not next_cursor or any(tx['tx_hash'] == gap['target'] for tx in history):
+                self.store.close_gap(gap['id'])
                 break
+        return pages
 
-        
-        print(f"Processing {len(urls)} pages for transactions...")
-        buyers = set()
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
-            futures = []
-            for url in urls:
-                futures.append(executor.submit(self.fetch_page, url))
-
-            for future in concurrent.futures.as_completed(futures):
-                page_data = future.result()
-                if not page_data:
-                    continue
-                    
-                with self.lock:
-                    for tx in page_data['history']:
-                        if tx['event'] == "buy":
-                            transaction = {
-                                "wallet": tx['maker'],
-                                "tx_hash": tx['tx_hash'],
-                                "type": tx['event'],
-                                "amount_usd": tx.get('amount_usd'),
-                                "timestamp": tx.get('timestamp')
-                            }
-                            all_transactions.append(transaction)
-                            buyers.add(tx['maker'])
+    def scan_summary(self, contract_address: str):
+        """Totals for everything collected so far by scans of a contract"""
+        total_trades, total_buyers = self.store.counts(contract_address)
+        return {
+            "contract_address": contract_address,
+            "total_buyers": total_buyers,
+            "total_trades": total_trades,
+            "complete": self.store.complete(contract_address)
+        }
+
+    def scan_transactions(self, contract_address: str, max_threads: int = 5, resume: bool = True,
+                          progress=None):
+        """Scan all transactions for a contract and collect buyer addresses"""
+        for _ in self.iter_transactions(contract_address, max_threads, resume, False, progress):
+            pass
+
+        all_transactions = self.store.transactions(contract_address)
+        buyers = {transaction['wallet'] for transaction in all_transactions}
 
         return {
             "contract_address": contract_address,
             "total_buyers": len(buyers),
             "buyer_addresses": list(buyers),
-            "transactions": all_transactions
-        } 
\ No newline at end of file
+            "transactions": all_transactions,
+            "complete": self.store.complete(contract_address)
+        }
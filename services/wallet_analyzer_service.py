@@ -1,113 +1,91 @@
 import json
-import time
-import random
-import tls_client
-from fake_useragent import UserAgent
+from .base_service import BaseService
+from .concurrency import map_bounded, gather, DEFAULT_MAX_WORKERS, DEFAULT_DEADLINE
+from .retry_policy import RetryPolicy
+from .pnl_distribution import pnl_distribution
+from .response_cache import has_data
 
-class WalletAnalyzerService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-        self.sendRequest.timeout_seconds = 60
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random
-        }
+# Metrics that can be filtered on, each as min_/max_<metric>_7d and _30d
+FILTER_METRICS = ('profit', 'winrate', 'trades')
 
+class WalletAnalyzerService(BaseService):
     def get_token_distribution(self, wallet: str):
         """Get token distribution data for a wallet"""
         url = f"https://gmgn.ai/defi/quotation/v1/rank/sol/wallets/{wallet}/unique_token_7d?interval=30d"
-        retries = 3
+        retry = RetryPolicy(3)
         
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
-                response = self.sendRequest.get(url, headers=self.headers, allow_redirects=True)
+                response = self.sendRequest.get(url, headers=self.headers, allow_redirects=True, validate=has_data)
                 if response.status_code == 200:
                     data = response.json()
-                    tokens = data['data']['tokens']
-                    
-                    distribution = {
-                        "-50% +": 0,
-                        "0% - -50%": 0,
-                        "0 - 50%": 0,
-                        "50% - 199%": 0,
-                        "200% - 499%": 0,
-                        "500% - 600%": 0,
-                        "600% +": 0
-                    }
-
-                    for token in tokens:
-                        profit_pnl = token.get('total_profit_pnl')
-                        if profit_pnl is not None:
-                            profit_percentage = profit_pnl * 100
-                            
-                            if profit_percentage <= -50:
-                                distribution["-50% +"] += 1
-                            elif -50 < profit_percentage < 0:
-                                distribution["0% - -50%"] += 1
-                            elif 0 <= profit_percentage < 50:
-                                distribution["0 - 50%"] += 1
-                            elif 50 <= profit_percentage < 199:
-                                distribution["50% - 199%"] += 1
-                            elif 200 <= profit_percentage < 499:
-                                distribution["200% - 499%"] += 1
-                            elif 500 <= profit_percentage < 600:
-                                distribution["500% - 600%"] += 1
-                            elif profit_percentage >= 600:
-                                distribution["600% +"] += 1
-                                
-                    return distribution
+                    return pnl_distribution.distribute(data['data']['tokens'])
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching token distribution on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
-    def get_wallet_data(self, wallet: str):
-        """Get wallet data including 7d and 30d metrics"""
-        url = f"https://gmgn.ai/defi/quotation/v1/smartmoney/sol/walletNew/{wallet}?period=7d"
-        retries = 5
+    def get_wallet_stats(self, wallet: str, period='7d'):
+        """Get the smart money stats of a wallet for a period"""
+        url = f"https://gmgn.ai/defi/quotation/v1/smartmoney/sol/walletNew/{wallet}?period={period}"
+        retry = RetryPolicy(5)
         
-        for attempt in range(retries):
+        for attempt in retry:
             try:
                 self.randomise()
                 response = self.sendRequest.get(url, headers=self.headers)
                 if response.status_code == 200:
                     data = response.json()
                     if data['msg'] == "success":
-                        wallet_data = data['data']
-                        
-                        
-                        url_30d = f"https://gmgn.ai/defi/quotation/v1/smartmoney/sol/walletNew/{wallet}?period=30d"
-                        response_30d = self.sendRequest.get(url_30d, headers=self.headers)
-                        data_30d = response_30d.json()['data']
-                        
-                        
-                        token_distribution = self.get_token_distribution(wallet)
-                        
-                        return self.process_wallet_data(wallet, wallet_data, data_30d, token_distribution)
+                        return data['data']
+                retry.failed(response)
             except Exception as e:
                 print(f"Error fetching wallet data on attempt {attempt + 1}: {e}")
-            time.sleep(1)
+                retry.failed(error=e)
         return None
 
+    def get_wallet_data(self, wallet: str, deadline=DEFAULT_DEADLINE, filters=None):
+        """Get wallet data including 7d and 30d metrics
+
+        Without filters the lookups run concurrently; anything but the 7d
+        stats that has not answered by the deadline is left out of the result.
+        With filters each period is checked as soon as its stats arrive, so a
+        wallet rejected on its 7d numbers costs a single request.
+        """
+        if not filters:
+            results = gather({
+                "wallet_7d": lambda: self.get_wallet_stats(wallet, '7d'),
+                "wallet_30d": lambda: self.get_wallet_stats(wallet, '30d'),
+                "distribution": lambda: self.get_token_distribution(wallet)
+            }, deadline, required=("wallet_7d",))
+        else:
+            results = {"wallet_7d": self.get_wallet_stats(wallet, '7d')}
+            if results["wallet_7d"] is None or not self.passes_filters(results["wallet_7d"], '7d', filters):
+                return None
+
+            if any(filters.get(f"{bound}_{name}_30d") for bound in ('min', 'max') for name in FILTER_METRICS):
+                # Stats that never arrived cannot pass a 30d filter
+                results["wallet_30d"] = self.get_wallet_stats(wallet, '30d')
+                if results["wallet_30d"] is None or not self.passes_filters(results["wallet_30d"], '30d', filters):
+                    return None
+                results["distribution"] = self.get_token_distribution(wallet)
+            else:
+                results.update(gather({
+                    "wallet_30d": lambda: self.get_wallet_stats(wallet, '30d'),
+                    "distribution": lambda: self.get_token_distribution(wallet)
+                }, deadline))
+
+        if results["wallet_7d"] is None:
+            return None
+        return self.process_wallet_data(
+            wallet,
+            results["wallet_7d"],
+            results["wallet_30d"] or {},
+            results["distribution"]
+        )
+
     def process_wallet_data(self, wallet, data_7d, data_30d, token_distribution):
         """Process wallet data into a formatted response"""
         try:
@@ -130,62 +108,41 @@ class WalletAnalyzerService:
             print(f"Error processing wallet data: {e}")
             return None
 
-    def analyze_wallets(self, wallets, filters=None):
+    def analyze_wallets(self, wallets, filters=None, max_threads=DEFAULT_MAX_WORKERS, progress=None):
         """Analyze multiple wallets with optional filtering"""
         if isinstance(wallets, str):
             wallets = [addr.strip() for addr in wallets.split(',')]
         
         results = []
-        for wallet in wallets:
-            data = self.get_wallet_data(wallet)
+        for data in map_bounded(lambda wallet: self.get_wallet_data(wallet, filters=filters), wallets, max_threads, progress):
             if data:
-                
-                if filters:
-                    if self.apply_filters(data, filters):
-                        results.append(data)
-                else:
-                    results.append(data)
+                results.append(data)
                     
         return results
     
-    def apply_filters(self, data, filters):
-        """Apply filters to wallet data"""
+    def passes_filters(self, data, period, filters):
+        """Apply the filters of one period ('7d' or '30d') to its raw stats
+
+        Values are rounded exactly as process_wallet_data displays them, so
+        a wallet passes or fails just as it would on the formatted output.
+        """
         try:
-            
-            profit_7d = float(data['profit_7d'].replace('$', '').replace(',', ''))
-            profit_30d = float(data['profit_30d'].replace('$', '').replace(',', ''))
-            winrate_7d = float(data['winrate_7d'].replace('%', ''))
-            winrate_30d = float(data['winrate_30d'].replace('%', ''))
-            trades_7d = int(data['trades_7d'])
-            trades_30d = int(data['trades_30d'])
-            
-            
-            if filters.get('min_profit_7d') and profit_7d < filters['min_profit_7d']:
-                return False
-            if filters.get('max_profit_7d') and profit_7d > filters['max_profit_7d']:
-                return False
-            if filters.get('min_profit_30d') and profit_30d < filters['min_profit_30d']:
-                return False
-            if filters.get('max_profit_30d') and profit_30d > filters['max_profit_30d']:
-                return False
-            if filters.get('min_winrate_7d') and winrate_7d < filters['min_winrate_7d']:
-                return False
-            if filters.get('max_winrate_7d') and winrate_7d > filters['max_winrate_7d']:
-                return False
-            if filters.get('min_winrate_30d') and winrate_30d < filters['min_winrate_30d']:
-                return False
-            if filters.get('max_winrate_30d') and winrate_30d > filters['max_winrate_30d']:
-                return False
-            if filters.get('min_trades_7d') and trades_7d < filters['min_trades_7d']:
-                return False
-            if filters.get('max_trades_7d') and trades_7d > filters['max_trades_7d']:
-                return False
-            if filters.get('min_trades_30d') and trades_30d < filters['min_trades_30d']:
-                return False
-            if filters.get('max_trades_30d') and trades_30d > filters['max_trades_30d']:
-                return False
-            
+            metrics = {
+                "profit": round(data[f'realized_profit_{period}'], 2) if data.get(f'realized_profit_{period}') is not None else 0.0,
+                "winrate": round(data['winrate'] * 100, 2) if data.get('winrate') is not None else 0.0,
+                "trades": int(data.get(f'buy_{period}', 0))
+            }
+
+            for name in FILTER_METRICS:
+                value = metrics[name]
+                minimum = filters.get(f"min_{name}_{period}")
+                maximum = filters.get(f"max_{name}_{period}")
+                if minimum and value < minimum:
+                    return False
+                if maximum and value > maximum:
+                    return False
+
             return True
         except Exception as e:
             print(f"Error applying filters: {e}")
-            return False 
\ No newline at end of file
+            return False
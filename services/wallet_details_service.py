@@ -1,38 +1,14 @@
 import json
 import time
-import random
-import tls_client
-from fake_useragent import UserAgent
+from .base_service import BaseService
 from datetime import datetime
 
-class WalletDetailsService:
-    def __init__(self):
-        self.sendRequest = tls_client.Session(client_identifier='chrome_103')
-        self.ua = UserAgent(os='linux', browsers=['firefox'])
-        
-    def randomise(self):
-        """Randomize the user agent and headers"""
-        self.identifier = random.choice([
-            browser for browser in tls_client.settings.ClientIdentifiers.__args__ 
-            if browser.startswith(('chrome', 'safari', 'firefox', 'opera'))
-        ])
-        self.sendRequest = tls_client.Session(
-            random_tls_extension_order=True, 
-            client_identifier=self.identifier
-        )
-
-        self.headers = {
-            'Host': 'gmgn.ai',
-            'accept': 'application/json, text/plain, */*',
-            'accept-language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
-            'dnt': '1',
-            'priority': 'u=1, i',
-            'referer': 'https://gmgn.ai/?chain=sol',
-            'user-agent': self.ua.random,
-            'from_app': 'gmgn',
-            'app_lang': 'en-US',
-            'os': 'web'
-        }
+class WalletDetailsService(BaseService):
+    extra_headers = {
+        'from_app': 'gmgn',
+        'app_lang': 'en-US',
+        'os': 'web'
+    }
 
     def get_wallet_details(self, wallet_address: str, period: str = '7d'):
         """Fetch detailed wallet information from all endpoints